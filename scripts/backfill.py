@@ -52,13 +52,13 @@ Usage:
 import argparse
 import csv
 import glob
-import json
 import os
 import sys
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import List, Dict, Set, Optional, Tuple
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 # Setup logging
@@ -72,10 +72,11 @@ logger = logging.getLogger(__name__)
 sys.path.insert(0, str(Path(__file__).parent))
 
 try:
-    from utils.geocoding import AdvancedGeocoder, GeocodingResult, GeocodeCache, encode_geohash
+    from utils.geocoding import AdvancedGeocoder, GeocodingResult, GeocodeCache, encode_geohash, nominatim_wait
     from utils.country_utils import normalize_country_to_iso3, iso3_to_country_name
     from utils.name_canonicalizer import FacilityNameCanonicalizer, choose_town_from_address
     from utils.facility_loader import (
+        decode_facility_json,
         load_facilities_from_country,
         save_facility as save_facility_util,
     )
@@ -109,7 +110,8 @@ except ImportError:
 # Web search + LLM extraction (for web_search strategy)
 try:
     from utils.web_search import WebSearchClient
-    from utils.llm_extraction import extract_coordinates, resolve_extraction_coordinates
+    from utils.llm_extraction import REFERENCE_TOWN_TTL, LLMUsage, extract_coordinates, resolve_extraction_coordinates
+    from utils.sources.query_cache import QueryCache
     WEB_SEARCH_AVAILABLE = True
 except ImportError:
     WEB_SEARCH_AVAILABLE = False
@@ -186,8 +188,7 @@ def build_global_slug_map(root: str = "facilities") -> Dict[str, str]:
 
     for p in root_path.glob("*/*.json"):
         try:
-            with open(p, "r", encoding="utf-8") as f:
-                doc = json.load(f)
+            doc = decode_facility_json(p.read_bytes())
             slug = doc.get("canonical_slug")
             fid = doc.get("facility_id")
             if slug and fid and slug not in slug_map:
@@ -211,14 +212,15 @@ def _geocode_via_web_search(
     country_iso3: str,
     commodities: List[str],
     web_search_client,
-    openai_client
+    openai_client,
+    extraction_cache=None,
+    llm_usage=None,
+    town_cache=None
 ) -> Optional[Dict]:
     """Geocode using web search + LLM extraction.
 
     Returns dict with lat, lon, confidence, source_url, province if found.
     """
-    import time
-
     # Build search query
     commodity_str = f" {commodities[0]}" if commodities else ""
     query = f"{facility_name}{commodity_str} mine {country_name} coordinates location"
@@ -240,7 +242,9 @@ def _geocode_via_web_search(
         client=openai_client,
         commodities=commodities,
         extract_companies=False,
-        extract_status=False
+        extract_status=False,
+        cache=extraction_cache,
+        usage=llm_usage
     )
 
     if not extraction or not extraction.found:
@@ -252,14 +256,11 @@ def _geocode_via_web_search(
         return None
 
     # Resolve coordinates (handles reference point calculation)
-    coords = resolve_extraction_coordinates(extraction, country_name)
+    coords = resolve_extraction_coordinates(extraction, country_name, town_cache=town_cache)
 
     if not coords:
         return None
 
-    # Rate limiting
-    time.sleep(0.5)
-
     return {
         'lat': coords[0],
         'lon': coords[1],
@@ -277,7 +278,11 @@ def backfill_geocoding(
     dry_run: bool = False,
     strategy: str = 'nominatim',
     null_island_only: bool = False,
-    limit: int = None
+    limit: int = None,
+    use_search_cache: bool = True,
+    workers: int = 4,
+    max_cost_usd: Optional[float] = None,
+    max_queries: Optional[int] = None
 ) -> BackfillStats:
     """Backfill missing coordinates.
 
@@ -289,6 +294,10 @@ def backfill_geocoding(
         strategy: 'nominatim', 'web_search', or 'combined'
         null_island_only: Only process (0,0) or missing coords
         limit: Max facilities to process
+        use_search_cache: Reuse cached web search results and LLM extractions
+        workers: Concurrent web search lookups (web_search/combined, non-interactive)
+        max_cost_usd: Stop once estimated LLM spend reaches this (web_search/combined)
+        max_queries: Stop once this many search API calls were sent (web_search/combined)
     """
     stats = BackfillStats()
     stats.total = len(facilities)
@@ -327,9 +336,17 @@ def backfill_geocoding(
     # Initialize web search client if needed
     web_search_client = None
     openai_client = None
+    extraction_cache = None
+    town_cache = None
+    llm_usage = None
     if strategy in ('web_search', 'combined') and WEB_SEARCH_AVAILABLE:
         import os
-        web_search_client = WebSearchClient()
+        web_search_client = WebSearchClient(use_cache=use_search_cache)
+        llm_usage = LLMUsage()
+        if use_search_cache:
+            # Extractions never go stale: the key is the exact prompt
+            extraction_cache = QueryCache("llm_extraction", ttl=float('inf'))
+            town_cache = QueryCache("reference_towns", ttl=REFERENCE_TOWN_TTL)
         try:
             from openai import OpenAI
             openai_client = OpenAI()
@@ -339,12 +356,21 @@ def backfill_geocoding(
                 logger.error("web_search strategy requires OpenAI - falling back to nominatim")
                 strategy = 'nominatim'
 
-    # Geocode each facility
-    for i, facility in enumerate(to_geocode):
-        facility_id = facility['facility_id']
+    def over_budget() -> Optional[str]:
+        """Reason to stop if a cost/query budget has been used up, else None."""
+        if llm_usage and max_cost_usd is not None and llm_usage.cost_usd() >= max_cost_usd:
+            return f"LLM cost budget of ${max_cost_usd:.2f} reached"
+        if web_search_client and max_queries is not None and web_search_client.api_calls >= max_queries:
+            return f"search budget of {max_queries} queries reached"
+        return None
+
+    def lookup(facility: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+        """Find candidate coordinates for one facility with the chosen strategy."""
+        if over_budget():
+            return None, None
+
         facility_name = facility.get('name', '')
         commodities = [c.get('metal', '') for c in facility.get('commodities', [])]
-        logger.info(f"[{i+1}/{len(to_geocode)}] {facility_name}")
 
         result = None
         source = None
@@ -359,7 +385,8 @@ def backfill_geocoding(
         elif strategy == 'web_search' and web_search_client and openai_client:
             result = _geocode_via_web_search(
                 facility_name, country_name, country_iso3, commodities,
-                web_search_client, openai_client
+                web_search_client, openai_client, extraction_cache, llm_usage,
+                town_cache=town_cache
             )
             source = 'web_search'
 
@@ -370,82 +397,117 @@ def backfill_geocoding(
             source = 'nominatim'
 
             if not result and web_search_client and openai_client:
-                logger.info("  Nominatim failed, trying web search...")
+                logger.info(f"  Nominatim failed for {facility_name}, trying web search...")
                 result = _geocode_via_web_search(
                     facility_name, country_name, country_iso3, commodities,
-                    web_search_client, openai_client
+                    web_search_client, openai_client, extraction_cache, llm_usage,
+                    town_cache=town_cache
                 )
                 source = 'web_search'
 
-        if result and result.get('lat') and result.get('lon'):
-            lat, lon = result['lat'], result['lon']
+        return result, source
 
-            # VALIDATION GATES - Prevent garbage coordinates
-            if is_sentinel_coord(lat, lon):
-                logger.warning(f"  ✗ Sentinel coordinates detected ({lat}, {lon}) - skipping write")
-                dq = facility.get('data_quality') or {}
-                dq.setdefault('flags', {})['sentinel_coords_rejected'] = True
-                facility['data_quality'] = dq
-                stats.add_result(facility_id, "failed", "Sentinel coordinates rejected")
-                continue
+    # Web search + LLM lookups are network-bound: run them on a worker pool
+    # ahead of the loop below, which still validates and saves serially in
+    # input order. Nominatim calls stay spaced by nominatim_wait across workers.
+    pool = None
+    if workers > 1 and not interactive and web_search_client and openai_client:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        lookups = pool.map(lookup, to_geocode)
+    else:
+        lookups = map(lookup, to_geocode)
 
-            if not is_valid_coord(lat, lon):
-                logger.warning(f"  ✗ Invalid coordinates ({lat}, {lon}) - skipping write")
-                dq = facility.get('data_quality') or {}
-                dq.setdefault('flags', {})['invalid_coords'] = True
-                facility['data_quality'] = dq
-                stats.add_result(facility_id, "failed", "Invalid coordinates")
-                continue
+    # Geocode each facility
+    try:
+        for i, facility in enumerate(to_geocode):
+            # Lookups that finished before the budget ran out are paid for,
+            # so they are still saved; stop at the first one skipped
+            result, source = next(lookups)
+            reason = over_budget() if source is None else None
+            if reason:
+                logger.warning(f"Stopping: {reason} ({len(to_geocode) - i} facilities not processed)")
+                break
 
-            if not in_country_bbox(lat, lon, country_iso3):
-                logger.warning(f"  ✗ Out-of-country coordinates ({lat}, {lon}) - skipping write")
-                dq = facility.get('data_quality') or {}
-                dq.setdefault('flags', {})['out_of_country'] = True
-                facility['data_quality'] = dq
-                stats.add_result(facility_id, "failed", f"Coordinates outside {country_iso3} bbox")
-                continue
+            facility_id = facility['facility_id']
+            logger.info(f"[{i+1}/{len(to_geocode)}] {facility.get('name', '')}")
+
+            if result and result.get('lat') and result.get('lon'):
+                lat, lon = result['lat'], result['lon']
+
+                # VALIDATION GATES - Prevent garbage coordinates
+                if is_sentinel_coord(lat, lon):
+                    logger.warning(f"  ✗ Sentinel coordinates detected ({lat}, {lon}) - skipping write")
+                    dq = facility.get('data_quality') or {}
+                    dq.setdefault('flags', {})['sentinel_coords_rejected'] = True
+                    facility['data_quality'] = dq
+                    stats.add_result(facility_id, "failed", "Sentinel coordinates rejected")
+                    continue
 
-            # Interactive confirmation
-            if interactive:
-                confirm = input(f"  Accept ({lat}, {lon}) from {source}? [Y/n/s(kip)]: ").strip().lower()
-                if confirm == 's':
-                    stats.add_result(facility_id, "skipped", "User skipped")
+                if not is_valid_coord(lat, lon):
+                    logger.warning(f"  ✗ Invalid coordinates ({lat}, {lon}) - skipping write")
+                    dq = facility.get('data_quality') or {}
+                    dq.setdefault('flags', {})['invalid_coords'] = True
+                    facility['data_quality'] = dq
+                    stats.add_result(facility_id, "failed", "Invalid coordinates")
                     continue
-                if confirm == 'n':
-                    stats.add_result(facility_id, "skipped", "User rejected")
+
+                if not in_country_bbox(lat, lon, country_iso3):
+                    logger.warning(f"  ✗ Out-of-country coordinates ({lat}, {lon}) - skipping write")
+                    dq = facility.get('data_quality') or {}
+                    dq.setdefault('flags', {})['out_of_country'] = True
+                    facility['data_quality'] = dq
+                    stats.add_result(facility_id, "failed", f"Coordinates outside {country_iso3} bbox")
                     continue
 
-            # All validations passed - safe to write
-            facility['location'] = {
-                'lat': lat,
-                'lon': lon,
-                'precision': result.get('precision', 'approximate')
-            }
-            if result.get('province'):
-                facility['location']['province'] = result['province']
+                # Interactive confirmation
+                if interactive:
+                    confirm = input(f"  Accept ({lat}, {lon}) from {source}? [Y/n/s(kip)]: ").strip().lower()
+                    if confirm == 's':
+                        stats.add_result(facility_id, "skipped", "User skipped")
+                        continue
+                    if confirm == 'n':
+                        stats.add_result(facility_id, "skipped", "User rejected")
+                        continue
+
+                # All validations passed - safe to write
+                facility['location'] = {
+                    'lat': lat,
+                    'lon': lon,
+                    'precision': result.get('precision', 'approximate')
+                }
+                if result.get('province'):
+                    facility['location']['province'] = result['province']
 
-            # Update verification
-            if 'verification' not in facility:
-                facility['verification'] = {}
+                # Update verification
+                if 'verification' not in facility:
+                    facility['verification'] = {}
 
-            facility['verification']['last_checked'] = datetime.now().isoformat()
-            notes = f"Geocoded via {source}"
-            if result.get('source_url'):
-                notes += f": {result['source_url']}"
-            facility['verification']['notes'] = notes
+                facility['verification']['last_checked'] = datetime.now().isoformat()
+                notes = f"Geocoded via {source}"
+                if result.get('source_url'):
+                    notes += f": {result['source_url']}"
+                facility['verification']['notes'] = notes
 
-            # Save
-            save_facility(facility, dry_run=dry_run)
+                # Save
+                save_facility(facility, dry_run=dry_run)
 
-            action = "Would update" if dry_run else "Updated"
-            logger.info(f"  ✓ {action}: {lat}, {lon} (via {source})")
-            stats.add_result(facility_id, "updated", f"{lat}, {lon}")
-        else:
-            logger.warning(f"  ✗ Failed to geocode - no results")
-            dq = facility.get('data_quality') or {}
-            dq.setdefault('flags', {})['geocode_failed'] = True
-            facility['data_quality'] = dq
-            stats.add_result(facility_id, "failed", "No coordinates found")
+                action = "Would update" if dry_run else "Updated"
+                logger.info(f"  ✓ {action}: {lat}, {lon} (via {source})")
+                stats.add_result(facility_id, "updated", f"{lat}, {lon}")
+            else:
+                logger.warning(f"  ✗ Failed to geocode - no results")
+                dq = facility.get('data_quality') or {}
+                dq.setdefault('flags', {})['geocode_failed'] = True
+                facility['data_quality'] = dq
+                stats.add_result(facility_id, "failed", "No coordinates found")
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    if web_search_client:
+        logger.info(f"Web search API calls: {web_search_client.api_calls}; "
+                    f"LLM calls: {llm_usage.calls} ({llm_usage.prompt_tokens} in / "
+                    f"{llm_usage.completion_tokens} out tokens, ~${llm_usage.cost_usd():.4f})")
 
     return stats
 
@@ -898,13 +960,12 @@ def backfill_towns(
                     if not offline:
                         try:
                             import requests
-                            import time
                             url = "https://nominatim.openstreetmap.org/reverse"
                             params = {'lat': lat, 'lon': lon, 'format': 'json', 'addressdetails': 1}
                             ua_contact = os.getenv("OSM_CONTACT_EMAIL", "ops@gsmc.example")
                             headers = {'User-Agent': f'GSMC-Facilities/2.1 (contact: {ua_contact})'}
+                            nominatim_wait(float(nominatim_delay))  # OSM policy compliance
                             response = requests.get(url, params=params, headers=headers, timeout=10)
-                            time.sleep(max(0.0, float(nominatim_delay)))  # OSM policy compliance
                             if response.status_code == 200:
                                 address = (response.json() or {}).get('address', {})
 
@@ -1140,12 +1201,13 @@ def backfill_canonical_names(
             detail = result['canonicalization_detail']  # {'type': .., 'core': .., ...}
 
             # Flags
-            town_missing = ((facility.get('location') or {}).get('town') is None)
+            loc = facility.get('location') or {}
+            town_missing = (loc.get('town') is None)
             operator_unresolved = bool(
                 (facility.get('company_mentions') or facility.get('operators')) and not facility.get('operator_display')
             )
             # Consider canonical "incomplete" if missing primary_type OR (missing town and we have coords)
-            has_coords = bool((facility.get('location') or {}).get('lat') and (facility.get('location') or {}).get('lon'))
+            has_coords = bool(loc.get('lat') and loc.get('lon'))
             canonical_incomplete = (comps.get('primary_type') is None) or (town_missing and has_coords)
 
             if dry_run:
@@ -1325,6 +1387,14 @@ def main():
     geocode_parser.add_argument('--null-island', action='store_true',
                                help='Only process facilities with null island (0,0) or missing coordinates')
     geocode_parser.add_argument('--limit', type=int, help='Limit number of facilities to process')
+    geocode_parser.add_argument('--no-cache', action='store_true',
+                               help='Ignore cached web search results and LLM extractions (web_search/combined strategies)')
+    geocode_parser.add_argument('--workers', type=int, default=4,
+                               help='Concurrent web search lookups (default: 4, ignored with --interactive)')
+    geocode_parser.add_argument('--max-cost-usd', type=float,
+                               help='Stop once estimated LLM spend for a country reaches this many USD')
+    geocode_parser.add_argument('--max-queries', type=int,
+                               help='Stop once this many web search API calls were sent for a country')
 
     # Companies subcommand
     companies_parser = subparsers.add_parser('companies', help='Backfill company resolution')
@@ -1443,7 +1513,11 @@ def main():
                 dry_run=args.dry_run,
                 strategy=getattr(args, 'strategy', 'nominatim'),
                 null_island_only=getattr(args, 'null_island', False),
-                limit=getattr(args, 'limit', None)
+                limit=getattr(args, 'limit', None),
+                use_search_cache=not getattr(args, 'no_cache', False),
+                workers=getattr(args, 'workers', 4),
+                max_cost_usd=getattr(args, 'max_cost_usd', None),
+                max_queries=getattr(args, 'max_queries', None)
             )
             all_stats[country_iso3] = {'geocoding': stats}
 
@@ -0,0 +1,90 @@
+"""
+Unit tests for backfill geocoding budgets (no network, no OpenAI).
+
+Covers:
+- Stopping at --max-queries search API calls
+- Stopping at --max-cost-usd estimated LLM spend
+"""
+
+import pathlib
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+# backfill.py exits at import when its utilities cannot be imported
+pytest.importorskip("requests")
+pytest.importorskip("pycountry")
+
+# backfill.py imports its helpers as utils.* from scripts/
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+import backfill
+
+# 10,000 prompt + 100 completion tokens of gpt-4o-mini: $0.00156 per call
+USAGE = SimpleNamespace(prompt_tokens=10_000, completion_tokens=100)
+
+
+class _SearchClient:
+    def __init__(self, **kwargs):
+        self.api_calls = 0
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Fake web search + LLM lookup; returns the list of facilities looked up."""
+    looked_up = []
+
+    def geocode(name, country_name, country_iso3, commodities, client, openai_client, cache, usage, town_cache=None):
+        looked_up.append(name)
+        client.api_calls += 1
+        usage.add(USAGE, "gpt-4o-mini")
+        return {"lat": -25.7, "lon": 27.4}
+
+    monkeypatch.setattr(backfill, "WEB_SEARCH_AVAILABLE", True)
+    monkeypatch.setattr(backfill, "WebSearchClient", _SearchClient)
+    monkeypatch.setattr(backfill, "_geocode_via_web_search", geocode)
+    monkeypatch.setattr(backfill, "save_facility", lambda facility, dry_run=False: True)
+    monkeypatch.setitem(sys.modules, "openai", types.SimpleNamespace(OpenAI=lambda: object()))
+    return looked_up
+
+
+def _facilities(n=50):
+    return [{"facility_id": f"zaf-mine-{i}-fac", "name": f"Mine {i}", "location": {}} for i in range(n)]
+
+
+class TestBudgets:
+    def test_stops_at_max_queries(self, lookups):
+        stats = backfill.backfill_geocoding(
+            _facilities(), "ZAF", strategy="web_search", workers=1, use_search_cache=False, max_queries=5
+        )
+
+        assert lookups == [f"Mine {i}" for i in range(5)]
+        assert stats.updated == 5
+
+    def test_stops_at_max_cost(self, lookups):
+        stats = backfill.backfill_geocoding(
+            _facilities(), "ZAF", strategy="web_search", workers=1, use_search_cache=False, max_cost_usd=0.01
+        )
+
+        # Six calls cost $0.00936; the seventh crosses $0.01
+        assert len(lookups) == 7
+        assert stats.updated == 7
+
+    def test_pool_stops_near_budget(self, lookups):
+        workers = 4
+        stats = backfill.backfill_geocoding(
+            _facilities(), "ZAF", strategy="web_search", workers=workers, use_search_cache=False, max_queries=5
+        )
+
+        # Lookups already in flight when the budget runs out may still finish
+        assert 5 <= len(lookups) < 5 + workers
+        assert stats.updated == len(lookups)
+
+    def test_no_budget_processes_everything(self, lookups):
+        stats = backfill.backfill_geocoding(
+            _facilities(10), "ZAF", strategy="web_search", workers=1, use_search_cache=False
+        )
+
+        assert stats.updated == 10
@@ -0,0 +1,227 @@
+"""
+Unit tests for facility type normalization and name canonicalization.
+
+Covers:
+- type_map.normalize_type lookup stages and confidences
+- name_canonicalizer helpers (slugs, core names, registry)
+"""
+
+import pytest
+
+from scripts.utils import name_canonicalizer
+from scripts.utils.name_canonicalizer import (
+    FacilityNameCanonicalizer,
+    SlugRegistry,
+    canonicalize_many,
+    extract_core_name,
+    slugify,
+)
+from scripts.utils.type_map import normalize_type
+
+
+@pytest.fixture
+def fresh_slugs(monkeypatch):
+    """Isolate each test from the module-level SLUGS registry."""
+    monkeypatch.setattr(name_canonicalizer, "SLUGS", SlugRegistry())
+
+
+class TestNormalizeType:
+    """Test the staged type lookup in normalize_type."""
+
+    def test_empty_and_numeric(self):
+        """Empty and numeric garbage fall back to facility."""
+        assert normalize_type("") == ("facility", 0.2)
+        assert normalize_type(None) == ("facility", 0.2)
+        assert normalize_type("16.797") == ("facility", 0.1)
+
+    def test_exact_match(self):
+        """Exact mapping keys are returned with top confidence."""
+        assert normalize_type("SX-EW") == ("hydromet_plant", 0.95)
+        assert normalize_type("steelworks") == ("steel_plant", 0.95)
+
+    def test_separator_insensitive_match(self):
+        """Underscores, hyphens and spaces are interchangeable."""
+        assert normalize_type("heap_leach") == ("heap_leach", 0.9)
+        assert normalize_type("wire_rod_mill") == ("rolling_mill", 0.9)
+        assert normalize_type("steel-works") == ("steel_plant", 0.9)
+
+    def test_separators_are_not_dropped(self):
+        """Run-together words are not matched as if separated."""
+        assert normalize_type("heapleach") == ("facility", 0.3)
+        assert normalize_type("processingplant") == ("processing_plant", 0.85)
+
+    def test_partial_match_uses_mapping_order(self):
+        """The earliest MAPPING key wins, not the leftmost occurrence."""
+        assert normalize_type("open pit mine") == ("mine", 0.85)
+        assert normalize_type("mine processing plant") == ("processing_plant", 0.85)
+        assert normalize_type("smelter and mine") == ("mine", 0.85)
+
+    def test_valid_type_containment(self):
+        """Valid enum values embedded in longer strings are found deterministically."""
+        assert normalize_type("heap_leach pad") == ("heap_leach", 0.7)
+        assert normalize_type("battery_recycling heap_leach") == ("battery_recycling", 0.7)
+
+    def test_fallback(self):
+        """Unknown strings map to facility with low confidence."""
+        assert normalize_type("warehouse") == ("facility", 0.3)
+
+
+class TestSlugify:
+    """Test slug generation."""
+
+    def test_transliterates_and_joins_parts(self):
+        """Accents are transliterated and parts joined with hyphens."""
+        assert slugify("São João", "", "Mine") == "sao-joao-mine"
+        assert slugify("Fushë-Arrëz", "Lak Roshi", "mine") == "fushe-arrez-lak-roshi-mine"
+
+    def test_collapses_separators(self):
+        """Runs of non-alphanumerics collapse to one hyphen, trimmed."""
+        assert slugify("--Sx/Ew__ (plant)  #2--") == "sx-ew-plant-2"
+
+    def test_empty_falls_back(self):
+        """Empty or symbol-only input yields the default slug."""
+        assert slugify("") == "facility"
+        assert slugify("()", "--") == "facility"
+
+
+class TestExtractCoreName:
+    """Test core-name extraction."""
+
+    def test_strips_operator_and_noise(self):
+        """Operator names, parentheticals and noise words are removed."""
+        assert extract_core_name("Anglo American Mogalakwena Mine", "Anglo American") == "Mogalakwena"
+        assert extract_core_name("Karee Mine (Rustenburg)") == "Karee"
+
+    def test_operator_match_is_case_insensitive(self):
+        """Operator matching ignores case and respects word boundaries."""
+        assert extract_core_name("BHP Olympic Dam", "bhp") == "Olympic Dam"
+        assert extract_core_name("BHPX Olympic Dam", "BHP") == "BHPX Olympic Dam"
+
+    def test_automaton_matches_regex(self):
+        """The Aho-Corasick noise stripper agrees with the regex alternation."""
+        if name_canonicalizer._NOISE_AUTOMATON is None:
+            pytest.skip("pyahocorasick not installed")
+        names = [
+            "Open Pit Mine", "open-pit_mine", "Pit2 Works", "Minex Mine-Plant",
+            "SX-EW Plant (Phase 2)", "Operations Operationsx", "sx-ewx works",
+        ]
+        for name in names:
+            assert name_canonicalizer._strip_noise(name) == name_canonicalizer._NOISE_RE.sub(" ", name)
+
+    def test_falls_back_to_name(self):
+        """A name made only of noise words is kept as-is."""
+        assert extract_core_name("Open Pit Mine ") == "Open Pit Mine"
+
+
+class TestCanonicalizeMany:
+    """Test column-wise batch canonicalization."""
+
+    FACILITIES = [
+        {"name": "Lak Roshi Mine", "types": ["mine"], "country_iso3": "ALB",
+         "location": {"town": "Fushe\u0308-Arrëz", "region": "Shkodër"}},
+        {"name": "Anglo American Mogalakwena Mine", "types": ["open pit mine"],
+         "operator_display": "Anglo American", "location": {"lat": -24.1, "lon": 28.9}},
+        {"name": "Mogalakwena", "primary_type": "mine", "type_confidence": 0.7,
+         "location": {"lat": -24.2, "lon": 28.8}},
+        {"name": "Kupferhütte", "types": [], "display_name_override": True,
+         "display_name": "KH", "location": {}},
+    ]
+
+    def test_matches_per_facility_results(self, fresh_slugs, monkeypatch):
+        """Batch output is identical to canonicalize_facility, row for row."""
+        pd = pytest.importorskip("pandas")
+
+        canonicalizer = FacilityNameCanonicalizer()
+        expected = [canonicalizer.canonicalize_facility(f) for f in self.FACILITIES]
+
+        monkeypatch.setattr(name_canonicalizer, "SLUGS", SlugRegistry())
+        df = pd.DataFrame([
+            {**{k: v for k, v in f.items() if k != "location"}, **f["location"]}
+            for f in self.FACILITIES
+        ])
+        result = canonicalize_many(df)
+
+        assert list(result.index) == list(df.index)
+        for row, exp in zip(result.to_dict("records"), expected):
+            for key, value in row.items():
+                assert value == exp[key], key
+
+    def test_arrow_batch_matches_dataframe(self, fresh_slugs, monkeypatch):
+        """canonicalize_batch gives the same rows as canonicalize_many."""
+        pd = pytest.importorskip("pandas")
+        pa = pytest.importorskip("pyarrow")
+
+        df = pd.DataFrame([
+            {**{k: v for k, v in f.items() if k != "location"}, **f["location"]}
+            for f in self.FACILITIES
+        ])
+        expected = canonicalize_many(df).to_dict("records")
+
+        monkeypatch.setattr(name_canonicalizer, "SLUGS", SlugRegistry())
+        table = FacilityNameCanonicalizer().canonicalize_batch(pa.Table.from_pandas(df))
+
+        assert table.to_pylist() == expected
+
+    def test_arrow_batch_composes_decomposed_names(self, fresh_slugs, monkeypatch):
+        """NFD names are normalized in Arrow to the same output as NFC input."""
+        pa = pytest.importorskip("pyarrow")
+
+        def batch(name):
+            monkeypatch.setattr(name_canonicalizer, "SLUGS", SlugRegistry())
+            table = pa.table({"name": [name], "town": ["Fushe\u0308-Arrëz"]})
+            return FacilityNameCanonicalizer().canonicalize_batch(table).to_pylist()
+
+        assert batch("Kupferhu\u0308tte") == batch("Kupferhütte")
+        assert batch("Kupferhu\u0308tte")[0]["canonical_name"] == "Fushë-Arrëz Kupferhütte"
+
+
+class TestSlugRegistry:
+    """Test SlugRegistry bookkeeping."""
+
+    def test_preseed_and_numeric_suffixes(self):
+        """Preseeded slugs collide; repeated collisions count upwards."""
+        registry = SlugRegistry(preseed=["karee-mine", ""])
+        registry.load_existing(["olympic-dam"])
+
+        assert "karee-mine" in registry
+        assert "" not in registry
+        assert registry.unique("olympic-dam") == "olympic-dam-2"
+        assert registry.unique("karee-mine") == "karee-mine-2"
+        assert registry.unique("karee-mine") == "karee-mine-3"
+        assert registry.unique("new-mine") == "new-mine"
+
+    def test_unique_many_matches_sequential(self):
+        """Batch resolution gives the same slugs as repeated unique() calls."""
+        batches = [
+            ["b", "c", "d"],
+            ["a", "e", "a"],
+            ["f", "a-north", "a"],
+        ]
+        meta = [{"region": "North"}, {}, {"region": "North"}]
+
+        batched, sequential = SlugRegistry(["a"]), SlugRegistry(["a"])
+        for slugs in batches:
+            assert batched.unique_many(slugs, meta) == [
+                sequential.unique(slug, **kwargs) for slug, kwargs in zip(slugs, meta)
+            ]
+        assert batched.seen == sequential.seen
+
+
+class TestSlugDisambiguation:
+    """Test slug collision handling through canonicalize_facility."""
+
+    def test_region_then_geohash_then_numeric(self, fresh_slugs):
+        """Collisions fall back to region, then geohash6, then a counter."""
+        pytest.importorskip("pygeohash")
+        canonicalizer = FacilityNameCanonicalizer()
+        fac = {"name": "Karee", "types": ["mine"],
+               "location": {"region": "North West", "lat": -25.7, "lon": 27.4}}
+
+        slugs = [canonicalizer.canonicalize_facility(fac)["canonical_slug"] for _ in range(4)]
+
+        assert slugs == [
+            "karee-mine",
+            "karee-mine-north-west",
+            "karee-mine-ke7mz9",
+            "karee-mine-2",
+        ]
@@ -0,0 +1,89 @@
+"""
+Unit tests for writing facility files.
+
+Covers:
+- Unchanged facilities are not rewritten
+- New files get the umask's default mode; rewrites keep the existing mode
+- Failed saves leave the original file intact, with no temp file behind
+"""
+
+import json
+import os
+
+import pytest
+
+from scripts.utils import facility_loader
+from scripts.utils.facility_loader import save_facility
+
+FACILITY = {
+    "facility_id": "zaf-mogalakwena-fac",
+    "name": "Mogalakwena",
+    "country_iso3": "ZAF",
+    "location": {"lat": -24.0, "lon": 28.9},
+}
+
+
+@pytest.fixture
+def saved(tmp_path):
+    """A facility already saved to disk, with an old mtime."""
+    path = tmp_path / "zaf-mogalakwena-fac.json"
+    facility = dict(FACILITY, _path=path)
+    assert save_facility(facility)
+    os.utime(path, (1_000_000_000, 1_000_000_000))
+    return facility, path
+
+
+class TestSaveFacility:
+    def test_round_trip_drops_metadata(self, saved):
+        facility, path = saved
+        assert json.loads(path.read_text(encoding="utf-8")) == FACILITY
+
+    def test_unchanged_save_does_not_rewrite(self, saved):
+        facility, path = saved
+        before = path.stat()
+
+        assert save_facility(facility)
+
+        after = path.stat()
+        assert after.st_mtime_ns == before.st_mtime_ns
+        assert after.st_ino == before.st_ino
+
+    def test_new_file_mode_follows_umask(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(facility_loader, "_UMASK", 0o027)
+        path = tmp_path / "zaf-mogalakwena-fac.json"
+
+        assert save_facility(dict(FACILITY, _path=path))
+
+        assert path.stat().st_mode & 0o777 == 0o640
+
+    def test_changed_save_keeps_file_mode(self, saved):
+        facility, path = saved
+        os.chmod(path, 0o664)
+
+        assert save_facility(dict(facility, name="Mogalakwena Mine"))
+
+        assert json.loads(path.read_text(encoding="utf-8"))["name"] == "Mogalakwena Mine"
+        assert path.stat().st_mode & 0o777 == 0o664
+
+    def test_unserializable_facility_leaves_original(self, saved):
+        facility, path = saved
+        original = path.read_bytes()
+
+        assert not save_facility(dict(facility, location=object()))
+
+        assert path.read_bytes() == original
+        assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+    def test_failed_write_leaves_original(self, saved, monkeypatch):
+        facility, path = saved
+        original = path.read_bytes()
+
+        def replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(facility_loader.os, "replace", replace)
+
+        assert not save_facility(dict(facility, name="Mogalakwena Mine"))
+
+        assert path.read_bytes() == original
+        assert [p.name for p in path.parent.iterdir()] == [path.name]
@@ -0,0 +1,372 @@
+"""
+Unit tests for LLM coordinate extraction, against a fake OpenAI client.
+
+Covers:
+- Coordinate strings parsed from search snippets (no LLM call)
+- The regex pre-pass short-circuiting extract_coordinates
+- Retrying transient API errors
+- Fitting search results into the prompt token budget
+- Cached extractions skipping the API call
+- Token usage and cost priced per model
+- The strict structured-output schema
+- Reference town lookups through an optional disk cache
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from scripts.utils import llm_extraction
+from scripts.utils.llm_extraction import extract_coordinates, parse_coordinates
+from scripts.utils.sources.query_cache import QueryCache
+
+FOUND = {
+    "found": True, "lat": -25.68, "lon": 27.42, "reference_town": None, "distance_km": None,
+    "direction": None, "province": "North West", "source_url": "https://b", "confidence": 0.9,
+    "notes": "stated", "is_real_facility": True,
+}
+
+
+class _APIError(Exception):
+    """Stand-in for openai.APIStatusError (status_code plus the HTTP response)."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class APIConnectionError(Exception):
+    """Same class name as the openai exception, which carries no status."""
+
+
+class _Client:
+    """Fake OpenAI client replaying canned responses or raising errors."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(reply)))],
+            usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=100),
+        )
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry sleeps instead of waiting, with jitter pinned to zero."""
+    recorded = []
+    monkeypatch.setattr(llm_extraction.time, "sleep", recorded.append)
+    monkeypatch.setattr(llm_extraction.random, "uniform", lambda a, b: 0.0)
+    return recorded
+
+
+class TestParseCoordinates:
+    @pytest.mark.parametrize("text, expected", [
+        ("located at 26°30'S, 27°18'E near Rustenburg", (-26.5, 27.3)),
+        ("26.512° S, 27.304° E", (-26.512, 27.304)),
+        ("12°N 1°W", (12.0, -1.0)),
+        ("lat: -26.51, lon: 27.30", (-26.51, 27.30)),
+        ("Latitude -26.51 Longitude 27.30", (-26.51, 27.30)),
+    ])
+    def test_recognized_forms(self, text, expected):
+        assert parse_coordinates(text) == pytest.approx(expected)
+
+    def test_seconds(self):
+        lat, lon = parse_coordinates("""25°41'30"S 27°25'E""")
+        assert lat == pytest.approx(-(25 + 41 / 60 + 30 / 3600))
+        assert lon == pytest.approx(27 + 25 / 60)
+
+    @pytest.mark.parametrize("text", [
+        "produced 26.5, 27.3 tonnes",  # unlabelled numbers
+        "Level 3 N 5 E",                # bare integers
+        "in 2019.5 S 45.1 E",           # part of a larger number
+        "95°N 10°E",                    # out of range
+    ])
+    def test_ambiguous_text_ignored(self, text):
+        assert parse_coordinates(text) is None
+
+
+class TestRegexPrepass:
+    RESULTS = [
+        {"title": "Other Mine", "url": "https://a", "content": "Other Mine lies at 24°0'S 28°0'E"},
+        {"title": "Karee Mine - Lonmin", "url": "https://b", "content": "Karee is at 25°41'S 27°25'E."},
+    ]
+
+    class _NoCallClient:
+        class chat:
+            class completions:
+                @staticmethod
+                def create(**kwargs):
+                    raise AssertionError("LLM should not be called")
+
+    def test_skips_llm_for_stated_coordinates(self):
+        result = extract_coordinates(
+            "Karee Mine", "South Africa", self.RESULTS, self._NoCallClient,
+            extract_companies=False, extract_status=False
+        )
+        assert result.found and result.source_url == "https://b"
+        assert (result.lat, result.lon) == pytest.approx((-25.6833, 27.4167), abs=1e-4)
+
+    def test_requires_facility_name_in_result(self):
+        assert llm_extraction.find_coordinates_in_results("Karee Mine", self.RESULTS[:1]) is None
+
+    def test_coordinates_of_another_facility_ignored(self):
+        content = "Kroondal Mine lies at 25°43'S 27°20'E. Karee Mine, operated by Lonmin, is further north."
+        results = [{"title": "Lonmin operations", "url": "https://c", "content": content}]
+        assert llm_extraction.find_coordinates_in_results("Karee Mine", results) is None
+
+    def test_name_must_match_whole_words(self):
+        results = [{"title": "Kareeberg Local Municipality", "url": "https://d",
+                    "content": "Kareeberg lies at 30°57'S 22°07'E in the Northern Cape."}]
+        assert llm_extraction.find_coordinates_in_results("Karee Mine", results) is None
+
+    def test_several_coordinate_pairs_left_to_llm(self):
+        results = [{"title": "Karee Mine", "url": "https://e",
+                    "content": "Karee shafts: K3 at 25°41'S 27°25'E; K4 at 25°40'S 27°27'E."}]
+        assert llm_extraction.find_coordinates_in_results("Karee Mine", results) is None
+
+
+class TestRetries:
+    def test_transient_errors_are_retried(self, sleeps):
+        client = _Client(_APIError(503), APIConnectionError("reset"), FOUND)
+
+        response = llm_extraction._create_completion(client, model="m")
+
+        assert json.loads(response.choices[0].message.content) == FOUND
+        assert len(client.calls) == 3
+        assert sleeps == [2.0, 4.0]
+
+    def test_retry_after_is_honoured(self, sleeps):
+        client = _Client(_APIError(429, {"retry-after": "20"}), FOUND)
+
+        llm_extraction._create_completion(client, model="m")
+
+        assert sleeps == [20.0]
+
+    @pytest.mark.parametrize("status", [400, 401, 404])
+    def test_client_errors_raise_immediately(self, sleeps, status):
+        client = _Client(_APIError(status), FOUND)
+
+        with pytest.raises(_APIError):
+            llm_extraction._create_completion(client, model="m")
+
+        assert len(client.calls) == 1
+        assert sleeps == []
+
+    def test_gives_up_after_max_retries(self, sleeps):
+        client = _Client(*[_APIError(503)] * 3)
+
+        with pytest.raises(_APIError):
+            llm_extraction._create_completion(client, max_retries=2, model="m")
+
+        assert len(client.calls) == 3
+
+    def test_extraction_survives_a_rate_limit(self, sleeps):
+        client = _Client(_APIError(429), FOUND)
+        results = [{"title": "Karee Mine", "url": "https://b", "content": "Karee Mine near Rustenburg"}]
+
+        result = extract_coordinates("Karee Mine", "South Africa", results, client)
+
+        assert result.found and result.province == "North West"
+        assert len(client.calls) == 2
+
+
+class TestPromptBudget:
+    @pytest.fixture(autouse=True)
+    def char_estimate(self, monkeypatch):
+        """Use the ~4 chars/token estimate whether or not tiktoken is installed."""
+        monkeypatch.setattr(llm_extraction, "tiktoken", None)
+
+    @staticmethod
+    def results(n, chars=1200):
+        return [
+            {"title": f"Result {i}", "url": f"https://example.com/{i}", "content": "x" * chars}
+            for i in range(1, n + 1)
+        ]
+
+    def test_results_truncated_to_budget(self):
+        one = llm_extraction.count_tokens(llm_extraction._format_result(1, self.results(1)[0], 1200))
+
+        budget = one + 200
+
+        text = llm_extraction._fit_results(self.results(8), budget, "gpt-4o-mini")
+
+        assert llm_extraction.count_tokens(text) <= budget
+        assert "x" * 1200 + "\n" in text
+        # The second result is halved to fit, the rest are dropped
+        assert "--- Result 2 ---" in text
+        assert "x" * 600 + "...\n" in text and "x" * 601 not in text.split("--- Result 2 ---")[1]
+        assert "--- Result 3 ---" not in text
+
+    def test_at_most_max_results(self):
+        text = llm_extraction._fit_results(self.results(20, chars=10), 100_000, "gpt-4o-mini")
+
+        assert text.count("--- Result") == llm_extraction.MAX_RESULTS
+
+    def test_prompt_fits_context_budget(self):
+        client = _Client(FOUND)
+
+        extract_coordinates("Karee Mine", "South Africa", self.results(50, chars=20_000), client)
+
+        messages = client.calls[0]["messages"]
+        prompt_tokens = sum(llm_extraction.count_tokens(m["content"]) for m in messages)
+        assert prompt_tokens <= llm_extraction.MAX_PROMPT_TOKENS - llm_extraction.RESERVED_OUTPUT_TOKENS
+        assert client.calls[0]["max_tokens"] == llm_extraction.RESERVED_OUTPUT_TOKENS
+
+
+class TestExtractionCache:
+    RESULTS = [{"title": "Karee Mine", "url": "https://b", "content": "Karee Mine near Rustenburg"}]
+
+    def test_cache_hit_skips_api_call(self, tmp_path):
+        cache = QueryCache("llm_extraction", tmp_path)
+        client = _Client(FOUND)
+        usage = llm_extraction.LLMUsage()
+
+        first = extract_coordinates("Karee Mine", "South Africa", self.RESULTS, client, cache=cache, usage=usage)
+        second = extract_coordinates("Karee Mine", "South Africa", self.RESULTS, client, cache=cache, usage=usage)
+
+        assert len(client.calls) == 1
+        assert usage.calls == 1
+        assert first == second and second.province == "North West"
+
+    def test_changed_results_miss_cache(self, tmp_path):
+        cache = QueryCache("llm_extraction", tmp_path)
+        client = _Client(FOUND, FOUND)
+        changed = [dict(self.RESULTS[0], content="Karee Mine, Marikana")]
+
+        extract_coordinates("Karee Mine", "South Africa", self.RESULTS, client, cache=cache)
+        extract_coordinates("Karee Mine", "South Africa", changed, client, cache=cache)
+
+        assert len(client.calls) == 2
+
+    def test_failed_extraction_not_cached(self, tmp_path):
+        cache = QueryCache("llm_extraction", tmp_path)
+        client = _Client(_APIError(400), FOUND)
+
+        assert extract_coordinates("Karee Mine", "South Africa", self.RESULTS, client, cache=cache) is None
+        assert extract_coordinates("Karee Mine", "South Africa", self.RESULTS, client, cache=cache).found
+        assert len(client.calls) == 2
+
+
+class TestLLMUsage:
+    USAGE = SimpleNamespace(prompt_tokens=10_000, completion_tokens=1_000)
+
+    def test_cost_priced_per_model(self):
+        usage = llm_extraction.LLMUsage()
+        usage.add(self.USAGE, "gpt-4o-mini")
+        usage.add(self.USAGE, "gpt-4o")
+
+        # gpt-4o-mini: $0.0015 + $0.0006; gpt-4o: $0.025 + $0.01
+        assert usage.cost_usd() == pytest.approx(0.0371)
+        assert (usage.calls, usage.prompt_tokens, usage.completion_tokens) == (2, 20_000, 2_000)
+
+    def test_extraction_records_its_model(self):
+        client = _Client(FOUND)
+        usage = llm_extraction.LLMUsage()
+        results = [{"title": "Karee Mine", "url": "https://b", "content": "Karee Mine near Rustenburg"}]
+
+        extract_coordinates("Karee Mine", "South Africa", results, client, model="gpt-4o", usage=usage)
+
+        assert usage.by_model == {"gpt-4o": [1000, 100]}
+
+    def test_unpriced_model_warns(self, caplog):
+        usage = llm_extraction.LLMUsage()
+        usage.add(self.USAGE, "some-new-model")
+
+        assert usage.cost_usd() == 0.0
+        assert "some-new-model" in caplog.text
+
+
+class TestResponseSchema:
+    @pytest.mark.parametrize("companies, status", [(True, True), (False, True), (True, False)])
+    def test_strict_schema_requires_every_property(self, companies, status):
+        schema = llm_extraction._response_schema(companies, status)["json_schema"]
+
+        assert schema["strict"] is True
+        body = schema["schema"]
+        assert body["additionalProperties"] is False
+        assert body["required"] == list(body["properties"])
+        assert ("companies" in body["properties"]) is companies
+        assert ("status" in body["properties"]) is status
+        assert set(llm_extraction.COORD_SCHEMA) <= set(body["properties"])
+
+    def test_schema_sent_and_companies_parsed(self):
+        reply = dict(FOUND, status="operating", companies={"operators": ["Lonmin"], "owners": ["Sibanye"], "notes": None})
+        client = _Client(reply)
+        results = [{"title": "Karee Mine", "url": "https://b", "content": "Karee Mine near Rustenburg"}]
+
+        result = extract_coordinates("Karee Mine", "South Africa", results, client)
+
+        assert client.calls[0]["response_format"] == llm_extraction._response_schema(True, True)
+        assert result.status == "operating"
+        assert (result.operators, result.owners) == (["Lonmin"], ["Sibanye"])
+
+
+class TestReferenceTowns:
+    QUERY = "Welkom, South Africa"
+    WELKOM = (-27.98, 26.73)
+
+    @pytest.fixture(autouse=True)
+    def nominatim(self, monkeypatch):
+        """Fake Nominatim finding only Welkom; records lookups and limiter waits."""
+        calls = SimpleNamespace(lookups=[], waits=[])
+        query, welkom = self.QUERY, self.WELKOM
+
+        class _Nominatim:
+            def __init__(self, user_agent):
+                pass
+
+            def geocode(self, q, timeout):
+                calls.lookups.append(q)
+                return SimpleNamespace(latitude=welkom[0], longitude=welkom[1]) if q == query else None
+
+        monkeypatch.setattr("geopy.geocoders.Nominatim", _Nominatim)
+        monkeypatch.setattr("scripts.utils.geocoding.nominatim_wait", calls.waits.append)
+        llm_extraction._cached_reference_town.cache_clear()
+        yield calls
+        llm_extraction._cached_reference_town.cache_clear()
+
+    def test_cache_hit_skips_nominatim(self, tmp_path, nominatim):
+        cache = QueryCache("reference_towns", tmp_path)
+        cache.set("nominatim", self.QUERY, list(self.WELKOM))
+
+        lat, lon = llm_extraction.calculate_from_reference("Welkom", "South Africa", 12, "NE", cache=cache)
+
+        assert nominatim.lookups == [] and nominatim.waits == []
+        # 12km north-east of Welkom
+        assert lat == pytest.approx(-27.90, abs=0.01) and lon == pytest.approx(26.82, abs=0.01)
+
+    def test_miss_waits_once_then_hits_cache(self, tmp_path, nominatim):
+        cache = QueryCache("reference_towns", tmp_path)
+
+        first = llm_extraction.calculate_from_reference("Welkom", "South Africa", 12, "NE", cache=cache)
+        llm_extraction._cached_reference_town.cache_clear()
+        second = llm_extraction.calculate_from_reference("Welkom", "South Africa", 12, "NE", cache=cache)
+
+        assert first == second
+        assert nominatim.lookups == [self.QUERY]
+        assert nominatim.waits == [llm_extraction.NOMINATIM_DELAY_S]
+        assert cache.get("nominatim", self.QUERY) == list(self.WELKOM)
+
+    def test_cached_not_found_returns_none(self, tmp_path, nominatim):
+        cache = QueryCache("reference_towns", tmp_path)
+        cache.set("nominatim", "Nowhere, South Africa", [])
+
+        assert llm_extraction.calculate_from_reference("Nowhere", "South Africa", 12, "NE", cache=cache) is None
+        assert nominatim.lookups == []
+
+    def test_no_cache_always_queries(self, nominatim):
+        for _ in range(2):
+            assert llm_extraction.calculate_from_reference("Welkom", "South Africa", 12, "NE")
+
+        assert nominatim.lookups == [self.QUERY, self.QUERY]
+        assert len(nominatim.waits) == 2
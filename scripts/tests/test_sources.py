@@ -0,0 +1,360 @@
+"""
+Unit tests for the Overpass and Wikidata geocoding sources.
+
+Covers:
+- QueryCache round trips and expiry
+- OverpassClient / WikidataClient cache hits (no network)
+"""
+
+import io
+import json
+import os
+import re
+import time
+
+import pytest
+
+from scripts.utils.sources import overpass, wikidata
+from scripts.utils.sources.overpass import OverpassClient
+from scripts.utils.sources.query_cache import QueryCache
+from scripts.utils.sources.wikidata import WikidataClient
+
+ELEMENTS = [
+    {"type": "node", "id": 1, "lat": 51.1, "lon": 71.4, "tags": {"name": "Inkai", "resource": "uranium"}},
+    {"type": "way", "id": 2, "center": {"lat": 43.2, "lon": 68.9}, "tags": {"landuse": "quarry"}},
+    {"type": "node", "id": 3, "tags": {"name": "no coordinates"}},
+]
+
+
+class _Response:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+    @property
+    def content(self):
+        return json.dumps(self.payload).encode("utf-8")
+
+    @property
+    def raw(self):
+        if not hasattr(self, "_raw"):
+            self._raw = io.BytesIO(self.content)
+        return self._raw
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Skip client-side rate limiting."""
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+
+
+class TestQueryCache:
+    """Test the on-disk query cache."""
+
+    def test_round_trip(self, tmp_path):
+        """Payloads come back as stored; other endpoints/queries miss."""
+        cache = QueryCache("overpass", tmp_path)
+        assert cache.get("https://a", "q") is None
+
+        cache.set("https://a", "q", ELEMENTS)
+
+        assert cache.get("https://a", "q") == ELEMENTS
+        assert cache.get("https://b", "q") is None
+        assert cache.get("https://a", "q2") is None
+
+    def test_expired_entries_miss(self, tmp_path):
+        """Entries older than the TTL are ignored."""
+        cache = QueryCache("wikidata", tmp_path, ttl=60)
+        cache.set("https://a", "q", [])
+        path = next((tmp_path / "wikidata").iterdir())
+        old = time.time() - 120
+        os.utime(path, (old, old))
+
+        assert cache.get("https://a", "q") is None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        """Unreadable cache files are treated as misses."""
+        cache = QueryCache("overpass", tmp_path)
+        cache.set("https://a", "q", [])
+        next((tmp_path / "overpass").iterdir()).write_bytes(b"not zlib")
+
+        assert cache.get("https://a", "q") is None
+
+    def test_failed_write_leaves_no_temp_file(self, tmp_path):
+        """A payload that cannot be encoded is not cached and leaves nothing behind."""
+        cache = QueryCache("overpass", tmp_path)
+        cache.set("https://a", "q", [object()])
+
+        assert cache.get("https://a", "q") is None
+        assert list((tmp_path / "overpass").iterdir()) == []
+
+
+class TestClientCaching:
+    """Test that clients reuse cached responses instead of the network."""
+
+    @pytest.mark.parametrize("streaming", [True, False])
+    def test_overpass_second_query_is_cached(self, tmp_path, monkeypatch, no_sleep, streaming):
+        """The second identical query parses cached elements."""
+        if streaming:
+            pytest.importorskip("ijson")
+        else:
+            monkeypatch.setattr(overpass, "ijson", None)
+        calls = []
+
+        def post(session, url, data, timeout, **kwargs):
+            calls.append(url)
+            return _Response({"elements": ELEMENTS})
+
+        monkeypatch.setattr(overpass.requests.Session, "post", post)
+        client = OverpassClient(cache_dir=tmp_path)
+
+        first = client.query("[out:json];node(1);out;")
+        second = client.query("[out:json];node(1);out;")
+
+        assert len(calls) == 1
+        assert first == second
+        assert [f.osm_id for f in first] == ["node/1", "way/2"]
+
+    @pytest.mark.parametrize("streaming", [True, False])
+    @pytest.mark.parametrize("payload", [
+        {"elements": ELEMENTS, "remark": "runtime error: Query timed out in \"query\" at line 3"},
+        {"elements": []},
+    ])
+    def test_overpass_partial_or_empty_result_not_cached(self, tmp_path, monkeypatch, no_sleep, streaming, payload):
+        """Responses with a remark or no elements are parsed but not cached."""
+        if streaming:
+            pytest.importorskip("ijson")
+        else:
+            monkeypatch.setattr(overpass, "ijson", None)
+        calls = []
+
+        def post(session, url, data, timeout, **kwargs):
+            calls.append(url)
+            return _Response(payload)
+
+        monkeypatch.setattr(overpass.requests.Session, "post", post)
+        client = OverpassClient(cache_dir=tmp_path)
+
+        first = client.query("[out:json];node(1);out;")
+        client.query("[out:json];node(1);out;")
+
+        assert len(calls) == 2
+        assert [f.osm_id for f in first] == (["node/1", "way/2"] if payload["elements"] else [])
+        assert list((tmp_path / "overpass").glob("*")) == []
+
+    def test_wikidata_second_query_is_cached(self, tmp_path, monkeypatch, no_sleep):
+        """The second identical SPARQL query returns cached bindings."""
+        bindings = [{"item": {"value": "http://www.wikidata.org/entity/Q1"}}]
+        calls = []
+
+        def get(session, url, params, timeout):
+            calls.append(url)
+            return _Response({"results": {"bindings": bindings}})
+
+        monkeypatch.setattr(wikidata.requests.Session, "get", get)
+        client = WikidataClient(cache_dir=tmp_path)
+
+        assert client.query("SELECT 1") == bindings
+        assert client.query("SELECT 1") == bindings
+        assert len(calls) == 1
+
+    def test_wikidata_empty_result_not_cached(self, tmp_path, monkeypatch, no_sleep):
+        """Queries without bindings go back to the network next time."""
+        calls = []
+
+        def get(session, url, params, timeout):
+            calls.append(url)
+            return _Response({"results": {"bindings": []}})
+
+        monkeypatch.setattr(wikidata.requests.Session, "get", get)
+        client = WikidataClient(cache_dir=tmp_path)
+
+        assert client.query("SELECT 1") == []
+        assert client.query("SELECT 1") == []
+        assert len(calls) == 2
+        assert not (tmp_path / "wikidata").exists()
+
+    def test_cache_can_be_disabled(self, monkeypatch, no_sleep):
+        """use_cache=False always goes to the network."""
+        calls = []
+
+        def post(session, url, data, timeout, **kwargs):
+            calls.append(url)
+            return _Response({"elements": []})
+
+        monkeypatch.setattr(overpass.requests.Session, "post", post)
+        client = OverpassClient(use_cache=False)
+        client.query("q")
+        client.query("q")
+
+        assert len(calls) == 2
+
+
+class TestSessions:
+    """Test pooled session lifecycle."""
+
+    @pytest.mark.parametrize("client_cls", [OverpassClient, WikidataClient])
+    def test_context_manager_closes_session(self, monkeypatch, client_cls):
+        """Leaving the with-block closes the pooled connections."""
+        closed = []
+        monkeypatch.setattr(overpass.requests.Session, "close", lambda session: closed.append(session))
+
+        with client_cls(use_cache=False) as client:
+            assert closed == []
+
+        assert closed == [client.session]
+
+
+class TestOverpassQuery:
+    """Test Overpass query construction."""
+
+    def test_name_regex_bounds_word_gap(self):
+        """Name words may be separated by a short gap, not arbitrary text."""
+        pattern = re.compile(OverpassClient(use_cache=False)._create_name_regex("Inkai Mine"), re.I)
+
+        assert pattern.search("Inkai Uranium Mine")
+        assert not pattern.search("Inkai " + "x" * 40 + " Mine")
+
+
+class TestOverpassFailover:
+    """Test endpoint failover and per-endpoint rate limiting."""
+
+    def test_busy_endpoint_falls_through(self, monkeypatch, no_sleep):
+        """429s and timeouts move on to the next endpoint."""
+        calls = []
+
+        def post(session, url, data, timeout, **kwargs):
+            calls.append(url)
+            if url == "https://a":
+                return _Response({}, status_code=429)
+            if url == "https://b":
+                raise overpass.requests.exceptions.Timeout()
+            return _Response({"elements": ELEMENTS[:1]})
+
+        monkeypatch.setattr(overpass.requests.Session, "post", post)
+        client = OverpassClient(use_cache=False, endpoints=["https://a", "https://b", "https://c"])
+
+        features = client.query("q")
+
+        assert calls == ["https://a", "https://b", "https://c"]
+        assert [f.osm_id for f in features] == ["node/1"]
+
+    def test_interrupted_stream_falls_through(self, monkeypatch, no_sleep):
+        """A dropped connection or truncated body mid-stream moves on to the next endpoint."""
+        pytest.importorskip("ijson")
+
+        class _Dropped(io.BytesIO):
+            def read(self, *args):
+                raise overpass.ProtocolError("Connection broken: IncompleteRead")
+
+        calls = []
+
+        def post(session, url, data, timeout, **kwargs):
+            calls.append(url)
+            response = _Response({"elements": ELEMENTS[:1]})
+            if url == "https://a":
+                response._raw = _Dropped()
+            elif url == "https://b":
+                response._raw = io.BytesIO(response.content[:30])
+            return response
+
+        monkeypatch.setattr(overpass.requests.Session, "post", post)
+        client = OverpassClient(use_cache=False, endpoints=["https://a", "https://b", "https://c"])
+
+        features = client.query("q")
+
+        assert calls == ["https://a", "https://b", "https://c"]
+        assert [f.osm_id for f in features] == ["node/1"]
+
+    def test_retries_back_off_after_all_endpoints_fail(self, monkeypatch):
+        """Endpoints are retried in rotation with growing waits, up to max_retries."""
+        sleeps, calls = [], []
+        monkeypatch.setattr(time, "sleep", sleeps.append)
+        monkeypatch.setattr(overpass.random, "random", lambda: 0.5)
+
+        def post(session, url, data, timeout, **kwargs):
+            calls.append(url)
+            if len(calls) < 5:
+                return _Response({}, status_code=503)
+            return _Response({"elements": ELEMENTS[:1]})
+
+        monkeypatch.setattr(overpass.requests.Session, "post", post)
+        client = OverpassClient(use_cache=False, rate_limit=0, endpoints=["https://a", "https://b"])
+
+        features = client.query("q")
+
+        assert calls == ["https://a", "https://b", "https://a", "https://b", "https://a"]
+        assert [s for s in sleeps if s > 0] == [1.5, 2.5, 4.5]
+        assert [f.osm_id for f in features] == ["node/1"]
+
+    def test_gives_up_after_max_retries(self, monkeypatch, no_sleep):
+        """A persistently busy endpoint yields an empty result."""
+        calls = []
+
+        def post(session, url, data, timeout, **kwargs):
+            calls.append(url)
+            return _Response({}, status_code=429)
+
+        monkeypatch.setattr(overpass.requests.Session, "post", post)
+        client = OverpassClient(use_cache=False, endpoints=["https://a"], max_retries=2)
+
+        assert client.query("q") == []
+        assert len(calls) == 3
+
+    def test_endpoints_have_separate_buckets(self, monkeypatch):
+        """Waiting on one endpoint does not delay another."""
+        sleeps = []
+        monkeypatch.setattr(time, "sleep", sleeps.append)
+        monkeypatch.setattr(overpass, "_RATE_LIMIT_BUCKETS", {})
+        client = OverpassClient(use_cache=False, rate_limit=60)
+
+        client._rate_limit_wait("https://a")
+        client._rate_limit_wait("https://b")
+        assert sleeps == []
+
+        client._rate_limit_wait("https://a")
+        assert len(sleeps) == 1 and 0 < sleeps[0] <= 60
+
+
+class TestOverpassBBox:
+    """Test bounding boxes clipped to country extents."""
+
+    def test_bbox_is_clipped_to_country(self):
+        """Only the part of the bbox inside the country extent is queried."""
+        ql = OverpassClient(use_cache=False)._build_mining_query("PER", bbox=(-20.0, -75.0, -15.0, -60.0))
+
+        assert "(-18.5,-75.0,-15.0,-68.5)" in ql
+        assert "area[" not in ql
+
+    def test_bbox_covering_country_uses_area(self):
+        """A bbox larger than the whole country falls back to the area filter."""
+        ql = OverpassClient(use_cache=False)._build_mining_query("PER", bbox=(-30.0, -90.0, 10.0, -60.0))
+
+        assert 'area["ISO3166-1"="PE"]' in ql
+
+    def test_bbox_outside_country_skips_query(self, monkeypatch):
+        """No request is sent for a bbox that cannot contain the country."""
+        client = OverpassClient(use_cache=False)
+        monkeypatch.setattr(client, "query", lambda ql: pytest.fail("queried"))
+
+        assert client.query_mining_features("KAZ", bbox=(-10.0, 10.0, -5.0, 20.0)) == []
+
+    def test_bbox_across_antimeridian_is_kept(self, monkeypatch):
+        """US bboxes in the western Aleutians (east of 172E) are queried unclipped."""
+        client = OverpassClient(use_cache=False)
+        queries = []
+        monkeypatch.setattr(client, "query", lambda ql: queries.append(ql) or [])
+
+        client.query_mining_features("USA", bbox=(51.0, 172.0, 53.0, 179.5))
+
+        assert len(queries) == 1
+        assert "(51.0,172.0,53.0,179.5)" in queries[0]
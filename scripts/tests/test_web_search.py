@@ -0,0 +1,251 @@
+"""
+Unit tests for WebSearchClient, against a fake HTTP session (no network).
+
+Covers:
+- Session reuse by clients and the standalone helpers
+- search_many concurrency and result order
+- Disk cache keyed by result count; empty results not cached
+- Retry backoff honouring Retry-After
+- Hedged searches racing both providers
+- In-memory memo handing out copies
+"""
+
+import threading
+
+import pytest
+from requests.exceptions import HTTPError
+
+from scripts.utils import web_search
+from scripts.utils.web_search import WebSearchClient, _retry_wait
+
+
+class _Response:
+    def __init__(self, payload=None, status_code=200, headers=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPError(f"HTTP {self.status_code}", response=self)
+
+    def json(self):
+        return self.payload
+
+
+class _Session:
+    """
+    Stand-in for requests.Session routing Tavily POSTs and Brave GETs.
+
+    Each provider is a callable taking the query and returning the result
+    list, or a _Response for error statuses.
+    """
+
+    def __init__(self, tavily=None, brave=None):
+        self.tavily = tavily
+        self.brave = brave
+        self.requests = []
+
+    def post(self, url, json, timeout):
+        self.requests.append(("tavily", json["query"]))
+        reply = self.tavily(json["query"])
+        return reply if isinstance(reply, _Response) else _Response({"results": reply})
+
+    def get(self, url, headers, params, timeout):
+        self.requests.append(("brave", params["q"]))
+        reply = self.brave(params["q"])
+        if isinstance(reply, _Response):
+            return reply
+        items = [{"title": r["title"], "url": r["url"], "description": r["content"]} for r in reply]
+        return _Response({"web": {"results": items}})
+
+
+def _results(query, n=2):
+    return [{"title": f"{query} {i}", "url": f"https://example.com/{i}", "content": query} for i in range(n)]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry sleeps instead of waiting, with jitter pinned to zero."""
+    recorded = []
+    monkeypatch.setattr(web_search.time, "sleep", recorded.append)
+    monkeypatch.setattr(web_search.random, "random", lambda: 0.0)
+    return recorded
+
+
+class TestSessions:
+    def test_standalone_helpers_share_module_session(self, monkeypatch, sleeps):
+        session = _Session(tavily=lambda q: _results(q), brave=lambda q: _results(q))
+        monkeypatch.setattr(web_search, "_DEFAULT_SESSION", session)
+
+        assert web_search.tavily_search("a", api_key="t") == _results("a")
+        assert web_search.brave_search("b", api_key="b") == _results("b")
+        assert session.requests == [("tavily", "a"), ("brave", "b")]
+
+    def test_clients_get_their_own_pool(self):
+        first, second = WebSearchClient(use_cache=False), WebSearchClient(use_cache=False)
+        assert first.session is not second.session
+        assert first.session is not web_search._DEFAULT_SESSION
+
+
+class TestSearchMany:
+    def test_concurrent_results_keep_input_order(self, sleeps):
+        # Every search blocks until four are in flight at once
+        barrier = threading.Barrier(4, timeout=5)
+
+        def tavily(query):
+            barrier.wait()
+            return _results(query, n=1)
+
+        client = WebSearchClient(tavily_key="t", fallback=False, session=_Session(tavily=tavily), use_cache=False)
+        queries = [f"mine {i}" for i in range(8)]
+
+        results = client.search_many(queries, max_workers=4)
+
+        assert results == [_results(q, n=1) for q in queries]
+
+    def test_repeated_queries_share_one_search(self, sleeps):
+        session = _Session(tavily=lambda q: _results(q))
+        client = WebSearchClient(tavily_key="t", fallback=False, session=session, use_cache=False)
+
+        results = client.search_many(["a", "b", "a"], max_workers=1)
+
+        assert results == [_results("a"), _results("b"), _results("a")]
+        assert session.requests == [("tavily", "a"), ("tavily", "b")]
+
+
+class TestDiskCache:
+    def test_key_includes_max_results(self, tmp_path, sleeps):
+        session = _Session(tavily=lambda q: _results(q))
+
+        def client():
+            # A fresh client each time, so only the disk cache is shared
+            return WebSearchClient(tavily_key="t", fallback=False, session=session, cache_dir=tmp_path)
+
+        client().search("q", max_results=3)
+        client().search("q", max_results=10)
+        assert len(session.requests) == 2
+
+        client().search("q", max_results=3)
+        assert len(session.requests) == 2
+
+    def test_empty_results_not_cached(self, tmp_path, sleeps):
+        session = _Session(tavily=lambda q: [])
+
+        for _ in range(2):
+            client = WebSearchClient(tavily_key="t", fallback=False, session=session, cache_dir=tmp_path)
+            assert client.search("q") == []
+
+        assert len(session.requests) == 2
+        assert not (tmp_path / "web_search").exists() or not any((tmp_path / "web_search").iterdir())
+
+
+class TestRetryWait:
+    def test_exponential_backoff(self, sleeps):
+        assert [_retry_wait(attempt) for attempt in (1, 2, 3, 8)] == [1, 2, 4, 60]
+
+    def test_longer_retry_after_wins(self, sleeps):
+        response = _Response(status_code=429, headers={"Retry-After": "30"})
+        assert _retry_wait(1, response) == 30
+
+    def test_shorter_or_unparseable_retry_after_keeps_backoff(self, sleeps):
+        assert _retry_wait(3, _Response(status_code=429, headers={"Retry-After": "1"})) == 4
+        http_date = {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"}
+        assert _retry_wait(3, _Response(status_code=503, headers=http_date)) == 4
+
+    def test_throttled_search_waits_retry_after(self, sleeps):
+        replies = iter([_Response(status_code=429, headers={"Retry-After": "12"}), _results("q")])
+        session = _Session(tavily=lambda q: next(replies))
+        client = WebSearchClient(tavily_key="t", fallback=False, session=session, use_cache=False)
+
+        assert client.search("q") == _results("q")
+        assert sleeps == [12]
+        assert len(session.requests) == 2
+
+    def test_client_error_is_not_retried(self, sleeps):
+        session = _Session(tavily=lambda q: _Response(status_code=401))
+        client = WebSearchClient(tavily_key="t", fallback=False, session=session, use_cache=False)
+
+        assert client.search("q") == []
+        assert sleeps == []
+        assert len(session.requests) == 1
+
+
+class TestHedged:
+    def client(self, session, **kwargs):
+        return WebSearchClient(tavily_key="t", brave_key="b", hedged=True, session=session, **kwargs)
+
+    def test_fastest_result_wins_without_waiting_for_loser(self, tmp_path, sleeps):
+        brave_started, brave_finished, release = threading.Event(), threading.Event(), threading.Event()
+
+        def slow_brave(query):
+            brave_started.set()
+            release.wait(5)
+            brave_finished.set()
+            return _results("brave")
+
+        def fast_tavily(query):
+            # Both requests are in flight before the race is decided
+            brave_started.wait(5)
+            return _results("tavily")
+
+        session = _Session(tavily=fast_tavily, brave=slow_brave)
+        client = self.client(session, cache_dir=tmp_path)
+        try:
+            # Returns while the losing request is still blocked
+            assert client.search("q") == _results("tavily")
+            assert not brave_finished.is_set()
+        finally:
+            release.set()
+
+        assert len(session.requests) == 2
+        cache = web_search.QueryCache("web_search", tmp_path)
+        assert cache.get("tavily", "10\nq") == _results("tavily")
+        assert cache.get("brave", "10\nq") is None
+
+    def test_queued_loser_is_cancelled(self, monkeypatch, sleeps):
+        # One worker: brave is still queued when tavily wins
+        pool = web_search.ThreadPoolExecutor
+        monkeypatch.setattr(web_search, "ThreadPoolExecutor", lambda max_workers: pool(max_workers=1))
+        session = _Session(tavily=lambda q: _results("tavily"), brave=lambda q: pytest.fail("searched"))
+        client = self.client(session, use_cache=False)
+
+        assert client.search("q") == _results("tavily")
+        assert session.requests == [("tavily", "q")]
+
+    def test_empty_result_does_not_win(self, sleeps):
+        session = _Session(tavily=lambda q: [], brave=lambda q: _results("brave"))
+        client = self.client(session, use_cache=False)
+
+        assert client.search("q") == _results("brave")
+        assert len(session.requests) == 2
+
+    def test_cached_result_skips_the_race(self, tmp_path, sleeps):
+        web_search.QueryCache("web_search", tmp_path).set("brave", "10\nq", _results("cached"))
+        session = _Session(tavily=lambda q: pytest.fail("searched"), brave=lambda q: pytest.fail("searched"))
+
+        assert self.client(session, cache_dir=tmp_path).search("q") == _results("cached")
+        assert session.requests == []
+
+
+class TestMemo:
+    def test_repeat_search_returns_copies(self, sleeps):
+        session = _Session(tavily=lambda q: _results(q))
+        client = WebSearchClient(tavily_key="t", fallback=False, session=session, use_cache=False)
+
+        first = client.search("q")
+        first[0]["title"] = "edited by caller"
+        first.append({"title": "extra"})
+        second = client.search("q")
+
+        assert second == _results("q")
+        assert len(session.requests) == 1
+
+    def test_empty_results_not_memoized(self, sleeps):
+        session = _Session(tavily=lambda q: [])
+        client = WebSearchClient(tavily_key="t", fallback=False, session=session, use_cache=False)
+
+        client.search("q")
+        client.search("q")
+
+        assert len(session.requests) == 2
@@ -29,6 +29,20 @@ import re
 ROOT = Path(__file__).parent.parent.parent
 FACILITIES_DIR = ROOT / "facilities"
 
+# Name-quality patterns, compiled once; generic placeholders share one
+# alternation so each name is scanned a single time
+NUMERIC_NAME_RE = re.compile(r'^\d+$')
+GENERIC_NAME_RE = re.compile(
+    r'^(?:'
+    r'mine \d+$'
+    r'|facility \d+$'
+    r'|project \d+$'
+    r'|unknown'
+    r'|unnamed'
+    r'|tbd$'
+    r')'
+)
+
 
 class FacilityAuditor:
     """Audit facilities for completeness and quality issues."""
@@ -39,20 +53,11 @@ class FacilityAuditor:
 
     def is_numeric_name(self, name: str) -> bool:
         """Check if facility name is just numbers."""
-        return bool(re.match(r'^\d+$', name.strip()))
+        return bool(NUMERIC_NAME_RE.match(name.strip()))
 
     def is_generic_name(self, name: str) -> bool:
         """Check if facility name is generic/placeholder."""
-        generic_patterns = [
-            r'^mine \d+$',
-            r'^facility \d+$',
-            r'^project \d+$',
-            r'^unknown',
-            r'^unnamed',
-            r'^tbd$',
-        ]
-        name_lower = name.lower().strip()
-        return any(re.match(pattern, name_lower) for pattern in generic_patterns)
+        return bool(GENERIC_NAME_RE.match(name.lower().strip()))
 
     def audit_facility(self, facility: Dict, file_path: Path) -> List[str]:
         """Audit a single facility and return list of issues."""
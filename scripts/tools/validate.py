@@ -41,6 +41,7 @@ FACILITIES_DIR = ROOT / "facilities"
 CACHE_DIR = ROOT / ".cache"
 
 sys.path.insert(0, str(ROOT / "scripts"))
+from utils.facility_loader import decode_facility_json, list_facility_files
 
 # Try importing geopandas for polygon validation
 try:
@@ -289,10 +290,9 @@ class PolygonValidator:
         total = 0
 
         for country_dir in country_dirs:
-            for fac_file in sorted(country_dir.glob("*.json")):
+            for fac_file in list_facility_files(country_dir):
                 try:
-                    with open(fac_file, 'r') as f:
-                        facility = json.load(f)
+                    facility = decode_facility_json(fac_file.read_bytes())
                     total += 1
                     error = self.validate_facility(facility, fac_file)
                     if error:
@@ -430,10 +430,9 @@ class GeocodingValidator:
         print(f"Validating {len(country_dirs)} countries...")
 
         for country_dir in sorted(country_dirs):
-            for fac_file in country_dir.glob("*.json"):
+            for fac_file in list_facility_files(country_dir):
                 try:
-                    with open(fac_file, 'r') as f:
-                        facility = json.load(f)
+                    facility = decode_facility_json(fac_file.read_bytes())
                     errors = self.validate_facility(facility, fac_file)
                     self.errors.extend(errors)
                     for error in errors:
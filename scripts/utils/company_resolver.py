@@ -43,6 +43,14 @@ from entityidentity.companies import EnhancedCompanyMatcher
 
 logger = logging.getLogger(__name__)
 
+# Ownership text patterns (see FacilityCompanyResolver.resolve_owners)
+# "Company Name (XX%)" - most common
+_PCT_PAREN_RE = re.compile(r'([^,\(\)]+?)\s*\((\d+(?:\.\d+)?)\s*%\)')
+# "Company Name XX%" - alternative format
+_PCT_BARE_RE = re.compile(r'([^,\d]+?)\s+(\d+(?:\.\d+)?)\s*%')
+# Leading "Joint venture:" / "JV:" labels
+_JV_PREFIX_RE = re.compile(r'^(joint\s+venture|jv)\s*:\s*', re.IGNORECASE)
+
 
 def haversine_distance(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> float:
     """Calculate the great circle distance between two points on Earth.
@@ -331,6 +339,26 @@ class FacilityCompanyResolver:
             self._cache[cache_key] = None
             return None
 
+    def resolve_operators(
+        self,
+        operator_names: List[str],
+        country_hint: Optional[str] = None
+    ) -> Dict[str, Optional[Dict]]:
+        """Resolve several operator names, matching each distinct name once.
+
+        Args:
+            operator_names: Raw operator names (duplicates allowed)
+            country_hint: Optional ISO2 or ISO3 country code for filtering
+
+        Returns:
+            Dictionary mapping each input name to its resolve_operator result
+        """
+        resolved: Dict[str, Optional[Dict]] = {}
+        for name in operator_names:
+            if name not in resolved:
+                resolved[name] = self.resolve_operator(name, country_hint)
+        return resolved
+
     def resolve_owners(
         self,
         owner_text: str,
@@ -378,56 +406,48 @@ class FacilityCompanyResolver:
 
         logger.info(f"Parsing ownership: {owner_text}")
 
-        owner_links = []
-
+        # Phase 1: extract (company_name, percentage) candidates
         # Pattern 1: "Company Name (XX%)" - most common
-        pattern1 = r'([^,\(\)]+?)\s*\((\d+(?:\.\d+)?)\s*%\)'
-        matches = re.findall(pattern1, owner_text)
+        matches = _PCT_PAREN_RE.findall(owner_text)
 
         # Pattern 2: "Company Name XX%" - alternative format
         if not matches:
-            pattern2 = r'([^,\d]+?)\s+(\d+(?:\.\d+)?)\s*%'
-            matches = re.findall(pattern2, owner_text)
+            matches = _PCT_BARE_RE.findall(owner_text)
 
         if matches:
-            # Parse companies with percentages
-            for company_name, percentage in matches:
-                company_name = company_name.strip()
-                # Remove common prefixes like "Joint venture:", "JV:"
-                company_name = re.sub(r'^(joint\s+venture|jv)\s*:\s*', '',
-                                     company_name, flags=re.IGNORECASE)
-
-                resolved = self.resolve_operator(company_name, country_hint)
-
-                if resolved:
-                    percentage_float = float(percentage)
-
-                    owner_links.append({
-                        "company_id": resolved['company_id'],
-                        "role": "owner" if percentage_float > 50 else "minority_owner",
-                        "percentage": percentage_float,
-                        "confidence": resolved['confidence']
-                    })
-                else:
-                    logger.warning(f"Could not resolve owner: {company_name}")
+            # Remove common prefixes like "Joint venture:", "JV:"
+            candidates = [
+                (_JV_PREFIX_RE.sub('', company_name.strip()), float(percentage))
+                for company_name, percentage in matches
+            ]
         else:
             # No percentages found - treat as single owner
-            owner_text_clean = owner_text.strip()
-            # Remove common prefixes
-            owner_text_clean = re.sub(r'^(joint\s+venture|jv)\s*:\s*', '',
-                                     owner_text_clean, flags=re.IGNORECASE)
-
-            resolved = self.resolve_operator(owner_text_clean, country_hint)
-
-            if resolved:
-                owner_links.append({
-                    "company_id": resolved['company_id'],
-                    "role": "owner",
-                    "percentage": None,  # Unknown percentage
-                    "confidence": resolved['confidence']
-                })
+            candidates = [(_JV_PREFIX_RE.sub('', owner_text.strip()), None)]
+
+        # Phase 2: resolve each distinct name once
+        resolved_by_name = self.resolve_operators(
+            [company_name for company_name, _ in candidates], country_hint
+        )
+
+        # Phase 3: build owner links in text order
+        owner_links = []
+        for company_name, percentage in candidates:
+            resolved = resolved_by_name[company_name]
+            if not resolved:
+                logger.warning(f"Could not resolve owner: {company_name}")
+                continue
+
+            if percentage is None:
+                role = "owner"  # Unknown percentage
             else:
-                logger.warning(f"Could not resolve owner: {owner_text_clean}")
+                role = "owner" if percentage > 50 else "minority_owner"
+
+            owner_links.append({
+                "company_id": resolved['company_id'],
+                "role": role,
+                "percentage": percentage,
+                "confidence": resolved['confidence']
+            })
 
         logger.info(f"Resolved {len(owner_links)} owners from text")
         return owner_links
@@ -62,6 +62,7 @@ import shutil
 import tempfile
 import os
 import requests
+import threading
 from datetime import datetime, timezone
 import logging
 from typing import Optional, Dict, List, Tuple, Any
@@ -479,6 +480,11 @@ RATE_LIMITS = {
 # Request tracking for rate limiting
 LAST_REQUEST_TIMES = {}
 
+# Earliest monotonic time the next Nominatim request may start (shared by all
+# Nominatim callers in the process, see nominatim_wait)
+_NOMINATIM_NEXT_TS = 0.0
+_NOMINATIM_LOCK = threading.Lock()
+
 
 @dataclass
 class GeocodingResult:
@@ -570,10 +576,10 @@ def geocode_via_nominatim(
             params["countrycodes"] = iso2.lower()
 
     try:
+        nominatim_wait(delay_s)  # OSM policy compliance
         resp = requests.get(url, params=params, headers=nominatim_headers(), timeout=10)
         resp.raise_for_status()
         items = resp.json() or []
-        time.sleep(delay_s)  # OSM policy compliance
 
         if not items:
             logger.debug(f"Nominatim: No results for '{query}'")
@@ -601,6 +607,31 @@ def geocode_via_nominatim(
         return None
 
 
+def nominatim_wait(min_interval: Optional[float] = None):
+    """
+    Block until the next Nominatim request may start.
+
+    Enforces the OSM usage policy (at most one request per min_interval
+    seconds) by spacing request start times, instead of sleeping a full
+    interval after every call: time already spent waiting on the previous
+    response, parsing or checking caches counts towards the interval.
+
+    Args:
+        min_interval: Seconds between requests (default: $NOMINATIM_DELAY_S or 1.0)
+    """
+    global _NOMINATIM_NEXT_TS
+
+    if min_interval is None:
+        min_interval = float(os.getenv("NOMINATIM_DELAY_S", "1.0"))
+
+    with _NOMINATIM_LOCK:
+        now = time.monotonic()
+        if _NOMINATIM_NEXT_TS > now:
+            time.sleep(_NOMINATIM_NEXT_TS - now)
+            now = _NOMINATIM_NEXT_TS
+        _NOMINATIM_NEXT_TS = now + max(0.0, min_interval)
+
+
 def rate_limit(source: str):
     """
     Rate limiting decorator for API calls.
@@ -974,7 +1005,7 @@ class AdvancedGeocoder:
             return []
 
         if self._overpass is None:
-            self._overpass = OverpassClient()
+            self._overpass = OverpassClient(use_cache=self.cache_results)
 
         candidates = []
 
@@ -1022,7 +1053,7 @@ class AdvancedGeocoder:
             return []
 
         if self._wikidata is None:
-            self._wikidata = WikidataClient()
+            self._wikidata = WikidataClient(use_cache=self.cache_results)
 
         candidates = []
 
@@ -1280,7 +1311,11 @@ def reverse_geocode_via_nominatim(
         "addressdetails": 1
     }
 
+    delay_s = float(os.getenv(delay_env, "1.0"))
+
     try:
+        # OSM policy delay
+        nominatim_wait(delay_s)
         r = requests.get(
             NOMINATIM_REVERSE_URL,
             params=params,
@@ -1290,7 +1325,7 @@ def reverse_geocode_via_nominatim(
 
         # Handle rate limiting
         if r.status_code == 429:
-            time.sleep(float(os.getenv(delay_env, "1.0")))
+            nominatim_wait(delay_s)
             r = requests.get(
                 NOMINATIM_REVERSE_URL,
                 params=params,
@@ -1301,9 +1336,6 @@ def reverse_geocode_via_nominatim(
         r.raise_for_status()
         data = r.json() or {}
 
-        # OSM policy delay
-        time.sleep(float(os.getenv(delay_env, "1.0")))
-
         return data.get("address") or {}
 
     except Exception as e:
@@ -17,13 +17,290 @@ Usage:
 """
 
 import json
+import random
+import re
+import threading
 import time
 import logging
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
+from .sources.query_cache import QueryCache
+
+# Try to import tiktoken for exact prompt token counts
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 logger = logging.getLogger(__name__)
 
+# Transient OpenAI failures worth retrying: rate limits and server errors
+# (APIStatusError subclasses carry .status_code), plus connection/timeouts.
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+RETRY_ERROR_NAMES = ('APIConnectionError', 'APITimeoutError')
+MAX_RETRIES = 3
+BACKOFF_MAX = 60.0
+
+
+# Prompt budget for extraction: gpt-4o-mini's window is far larger, but search
+# results past this point add cost without improving the extraction.
+MAX_PROMPT_TOKENS = 8192
+RESERVED_OUTPUT_TOKENS = 512
+MAX_RESULTS = 8
+MAX_CONTENT_CHARS = 1200
+
+SYSTEM_PROMPT = "You are an expert at extracting geographic coordinates from mining reports and technical documents. Be precise with coordinate signs (negative for South/West)."
+
+_ENCODINGS: Dict[str, Any] = {}
+
+# Reference towns recur across facilities ("12km NE of Welkom"); callers can
+# pass a QueryCache("reference_towns", ttl=REFERENCE_TOWN_TTL) to reuse their
+# Nominatim lookups in-process and on disk.
+NOMINATIM_USER_AGENT = "gsmc-facility-geocoder"
+NOMINATIM_DELAY_S = 1.1
+REFERENCE_TOWN_TTL = 30 * 24 * 3600  # seconds
+
+# Compass direction to bearing in degrees
+BEARINGS = {
+    "N": 0, "NNE": 22.5, "NE": 45, "ENE": 67.5,
+    "E": 90, "ESE": 112.5, "SE": 135, "SSE": 157.5,
+    "S": 180, "SSW": 202.5, "SW": 225, "WSW": 247.5,
+    "W": 270, "WNW": 292.5, "NW": 315, "NNW": 337.5
+}
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """
+    Count prompt tokens for `model`.
+
+    Uses tiktoken when installed; otherwise estimates ~4 characters per
+    token, which errs on the high side for English text.
+    """
+    if tiktoken is None:
+        return (len(text) + 3) // 4
+    enc = _ENCODINGS.get(model)
+    if enc is None:
+        try:
+            enc = tiktoken.encoding_for_model(model)
+        except KeyError:
+            enc = tiktoken.get_encoding("o200k_base")
+        _ENCODINGS[model] = enc
+    return len(enc.encode(text))
+
+
+# Strict structured-output schema mirroring the JSON layout described in the
+# prompt; optional sections are added per call (see _response_schema).
+_NULLABLE_STRING = {"type": ["string", "null"]}
+_NULLABLE_NUMBER = {"type": ["number", "null"]}
+COORD_SCHEMA = {
+    "found": {"type": "boolean"},
+    "lat": _NULLABLE_NUMBER,
+    "lon": _NULLABLE_NUMBER,
+    "reference_town": _NULLABLE_STRING,
+    "distance_km": _NULLABLE_NUMBER,
+    "direction": _NULLABLE_STRING,
+    "province": _NULLABLE_STRING,
+    "source_url": _NULLABLE_STRING,
+    "confidence": {"type": "number"},
+    "notes": _NULLABLE_STRING,
+    "is_real_facility": {"type": "boolean"},
+}
+STATUS_SCHEMA = {
+    "type": "string",
+    "enum": ["operating", "closed", "care_and_maintenance", "development", "unknown"],
+}
+COMPANIES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "operators": {"type": "array", "items": {"type": "string"}},
+        "owners": {"type": "array", "items": {"type": "string"}},
+        "notes": _NULLABLE_STRING,
+    },
+    "required": ["operators", "owners", "notes"],
+    "additionalProperties": False,
+}
+
+
+def _response_schema(extract_companies: bool, extract_status: bool) -> Dict[str, Any]:
+    """Build the response_format for a strict json_schema extraction."""
+    properties = dict(COORD_SCHEMA)
+    if extract_status:
+        properties["status"] = STATUS_SCHEMA
+    if extract_companies:
+        properties["companies"] = COMPANIES_SCHEMA
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "facility_extraction",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def _format_result(i: int, result: Dict, max_chars: int) -> str:
+    """Format one search result for the extraction prompt."""
+    content = result.get('content', 'N/A')
+    # Truncate long content
+    if len(content) > max_chars:
+        content = content[:max_chars] + "..."
+    return (
+        f"\n--- Result {i} ---\n"
+        f"Title: {result.get('title', 'N/A')}\n"
+        f"URL: {result.get('url', 'N/A')}\n"
+        f"Content: {content}\n"
+    )
+
+
+def _fit_results(search_results: List[Dict], budget: int, model: str) -> str:
+    """
+    Format search results (best-ranked first) into at most `budget` tokens.
+
+    Results are added in order until the next one would overflow; that one
+    is retried with its content halved until it fits (or drops below 200
+    chars), and later results are dropped.
+    """
+    parts = []
+    used = 0
+    for i, result in enumerate(search_results[:MAX_RESULTS], 1):
+        max_chars = MAX_CONTENT_CHARS
+        text = _format_result(i, result, max_chars)
+        tokens = count_tokens(text, model)
+        while used + tokens > budget and max_chars > 200:
+            max_chars //= 2
+            text = _format_result(i, result, max_chars)
+            tokens = count_tokens(text, model)
+        if used + tokens > budget:
+            logger.debug(f"Prompt budget reached: dropped results {i}-{min(len(search_results), MAX_RESULTS)}")
+            break
+        logger.debug(f"  result {i}: {tokens} tokens")
+        parts.append(text)
+        used += tokens
+    return "".join(parts)
+
+
+# Explicit coordinate strings in search snippets, e.g. 26°30'15"S 27°18'E,
+# 26.512° S, 27.304° E or "lat: -26.5, lon: 27.3"
+_DMS_PART = (
+    r"(?<![\d.])(?P<{0}_d>\d{{1,3}}(?:\.\d+)?)\s*(?P<{0}_deg>°|º)?\s*"
+    r"(?:(?P<{0}_m>\d{{1,2}}(?:\.\d+)?)\s*['′’]\s*)?"
+    r"(?:(?P<{0}_s>\d{{1,2}}(?:\.\d+)?)\s*(?:\"|″|”|'')\s*)?"
+    r"(?P<{0}_h>[{1}])\b"
+)
+_HEMISPHERE_COORD_RE = re.compile(
+    _DMS_PART.format("lat", "NS") + r"\s*[,;/]?\s*" + _DMS_PART.format("lon", "EW")
+)
+_LABELLED_COORD_RE = re.compile(
+    r"\blat(?:itude)?\s*[:=]?\s*(-?\d{1,2}\.\d+)\s*°?\s*[,;]?\s*"
+    r"(?:lon|lng|long|longitude)\s*[:=]?\s*(-?\d{1,3}\.\d+)",
+    re.IGNORECASE
+)
+# Words too generic to tie a snippet to a particular facility
+_GENERIC_NAME_WORDS = {'mine', 'mines', 'project', 'deposit', 'plant', 'the', 'and'}
+# Sentence/clause boundaries: a coordinate pair only counts for the facility
+# named in the same clause. Decimal points are not followed by whitespace.
+_CLAUSE_SPLIT_RE = re.compile(r"(?<=[.;!?])\s+|\n+")
+# Named facilities in a snippet ("Kroondal Mine", "Bushveld Complex Project")
+_FACILITY_MENTION_RE = re.compile(
+    r"\b((?:[A-Z][\w'-]*\s+)+)(?:Mines?|Project|Deposit|Plant|Smelter|Refinery|Shaft|Colliery)\b"
+)
+
+# USD per 1K tokens (input, output), for run cost estimates
+MODEL_PRICES_PER_1K = {
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+}
+
+
+class LLMUsage:
+    """Running token totals across extraction calls, per model (thread-safe)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.by_model: Dict[str, List[int]] = {}  # model -> [prompt, completion]
+        self._lock = threading.Lock()
+
+    def add(self, usage, model: str = "gpt-4o-mini") -> None:
+        """Accumulate an OpenAI response's usage block for `model`."""
+        if usage is None:
+            return
+        prompt = getattr(usage, 'prompt_tokens', 0) or 0
+        completion = getattr(usage, 'completion_tokens', 0) or 0
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt
+            self.completion_tokens += completion
+            totals = self.by_model.setdefault(model, [0, 0])
+            totals[0] += prompt
+            totals[1] += completion
+
+    def cost_usd(self) -> float:
+        """Estimated spend so far, priced per model; unpriced models count as 0."""
+        with self._lock:
+            by_model = {model: tuple(totals) for model, totals in self.by_model.items()}
+        cost = 0.0
+        for model, (prompt, completion) in by_model.items():
+            price = MODEL_PRICES_PER_1K.get(model)
+            if price is None:
+                _warn_unpriced(model)
+                continue
+            cost += (prompt * price[0] + completion * price[1]) / 1000
+        return cost
+
+
+@lru_cache(maxsize=None)
+def _warn_unpriced(model: str) -> None:
+    """Warn once per model that its spend is missing from cost estimates."""
+    logger.warning(f"No price for LLM model {model!r}; its tokens are left out of cost estimates")
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether an OpenAI client error is worth retrying."""
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in RETRY_STATUS_CODES
+    return type(error).__name__ in RETRY_ERROR_NAMES
+
+
+def _retry_wait(attempt: int, error: Exception) -> float:
+    """Seconds to wait before retry `attempt` (1-based), honoring Retry-After."""
+    wait = min(BACKOFF_MAX, 2.0 ** attempt + random.uniform(0, 1))
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        wait = max(wait, min(BACKOFF_MAX, float(headers.get('retry-after', 0))))
+    except (TypeError, ValueError):
+        pass  # HTTP-date form: fall back to the backoff
+    return wait
+
+
+def _create_completion(client, max_retries: int = MAX_RETRIES, **kwargs):
+    """
+    Call client.chat.completions.create, retrying transient failures.
+
+    By the time extraction runs, the facility's web searches have already
+    been paid for; a single 429/503 should not throw that work away.
+    Non-transient errors (bad request, auth) are raised immediately.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return client.chat.completions.create(**kwargs)
+        except Exception as e:
+            if attempt == max_retries or not _is_transient(e):
+                raise
+            wait = _retry_wait(attempt + 1, e)
+            logger.info(f"LLM request failed ({e}). Retrying in {wait:.1f}s...")
+            time.sleep(wait)
+
 
 @dataclass
 class ExtractionResult:
@@ -73,6 +350,116 @@ class ExtractionResult:
         )
 
 
+def _dms_component(match, prefix: str) -> Optional[float]:
+    """Decimal degrees for one hemisphere-tagged component of a match."""
+    degrees, minutes, seconds = (match.group(f"{prefix}_{k}") for k in "dms")
+    # Bare integers ("3 N") are too ambiguous without a degree sign or minutes
+    if not (match.group(f"{prefix}_deg") or minutes or '.' in degrees):
+        return None
+    minutes = float(minutes or 0)
+    seconds = float(seconds or 0)
+    if minutes >= 60 or seconds >= 60:
+        return None
+    value = float(degrees) + minutes / 60 + seconds / 3600
+    return -value if match.group(f"{prefix}_h") in "SW" else value
+
+
+def _coordinate_pairs(text: str) -> List[Tuple[float, float]]:
+    """All explicit coordinate pairs in `text` (see parse_coordinates), deduplicated."""
+    pairs = []
+    for match in _HEMISPHERE_COORD_RE.finditer(text):
+        lat = _dms_component(match, "lat")
+        lon = _dms_component(match, "lon")
+        if lat is not None and lon is not None and abs(lat) <= 90 and abs(lon) <= 180:
+            pairs.append((lat, lon))
+    for match in _LABELLED_COORD_RE.finditer(text):
+        lat, lon = float(match.group(1)), float(match.group(2))
+        if abs(lat) <= 90 and abs(lon) <= 180 and (lat, lon) != (0.0, 0.0):
+            pairs.append((lat, lon))
+    return list(dict.fromkeys(pairs))
+
+
+def parse_coordinates(text: str) -> Optional[Tuple[float, float]]:
+    """
+    Find the first explicit coordinate pair in free text.
+
+    Recognizes DMS or decimal degrees with hemisphere letters
+    (26°30'S 27°18'E, 26.51° S, 27.30° E) and labelled signed decimals
+    (lat: -26.51, lon: 27.30). Plain unlabelled number pairs are ignored.
+
+    Args:
+        text: Text to scan (e.g., a search result snippet)
+
+    Returns:
+        (lat, lon) in decimal degrees, or None
+    """
+    pairs = _coordinate_pairs(text)
+    return pairs[0] if pairs else None
+
+
+def _names_facility(text: str, word_res: List[re.Pattern]) -> bool:
+    """Whether every distinctive name word occurs in `text` as a whole word."""
+    return all(w.search(text) for w in word_res)
+
+
+def _names_other_facility(text: str, words: List[str]) -> bool:
+    """Whether `text` names a facility whose name lacks one of `words`."""
+    for match in _FACILITY_MENTION_RE.finditer(text):
+        mentioned = set(re.findall(r"\w+", match.group(1).lower()))
+        if not set(words) <= mentioned:
+            return True
+    return False
+
+
+def find_coordinates_in_results(
+    facility_name: str,
+    search_results: List[Dict]
+) -> Optional[ExtractionResult]:
+    """
+    Deterministic pre-pass: take coordinates stated verbatim in a snippet.
+
+    A result qualifies only if it states exactly one coordinate pair, names
+    no other facility, and that pair sits in a sentence or clause naming
+    every distinctive word of the facility name as a whole word ("Karee"
+    does not match "Kareeberg"). Anything less clear-cut is left to the LLM.
+
+    Args:
+        facility_name: Name of the facility
+        search_results: List of web search results with 'title', 'url', 'content'
+
+    Returns:
+        ExtractionResult (confidence 0.85) or None if no result states coordinates
+    """
+    words = [w for w in re.findall(r"\w+", facility_name.lower())
+             if len(w) > 2 and w not in _GENERIC_NAME_WORDS]
+    if not words:
+        return None
+    word_res = [re.compile(rf"\b{re.escape(w)}\b", re.IGNORECASE) for w in words]
+
+    for result in search_results[:MAX_RESULTS]:
+        text = f"{result.get('title') or ''}\n{result.get('content') or ''}"
+        if not _names_facility(text, word_res):
+            continue
+        pairs = _coordinate_pairs(text)
+        if len(pairs) != 1 or _names_other_facility(text, words):
+            continue
+        clause = next(
+            (c for c in _CLAUSE_SPLIT_RE.split(text) if _coordinate_pairs(c)),
+            None
+        )
+        if clause is None or not _names_facility(clause, word_res):
+            continue
+        return ExtractionResult(
+            found=True,
+            lat=pairs[0][0],
+            lon=pairs[0][1],
+            source_url=result.get('url'),
+            confidence=0.85,
+            notes="Coordinates stated in search result text",
+        )
+    return None
+
+
 def extract_coordinates(
     facility_name: str,
     country: str,
@@ -81,7 +468,9 @@ def extract_coordinates(
     commodities: Optional[List[str]] = None,
     extract_companies: bool = True,
     extract_status: bool = True,
-    model: str = "gpt-4o-mini"
+    model: str = "gpt-4o-mini",
+    cache=None,
+    usage: Optional[LLMUsage] = None
 ) -> Optional[ExtractionResult]:
     """
     Use LLM to extract coordinates and facility data from search results.
@@ -95,6 +484,9 @@ def extract_coordinates(
         extract_companies: Whether to extract company information
         extract_status: Whether to extract operational status
         model: LLM model to use (default: gpt-4o-mini for speed/cost)
+        cache: Optional QueryCache of raw LLM responses, keyed by model and
+            the exact prompt (so changed search results miss the cache)
+        usage: Optional LLMUsage to accumulate token counts into
 
     Returns:
         ExtractionResult with coordinates and optional company/status info,
@@ -103,17 +495,13 @@ def extract_coordinates(
     if not search_results:
         return None
 
-    # Format search results for LLM
-    results_text = ""
-    for i, result in enumerate(search_results[:8], 1):
-        results_text += f"\n--- Result {i} ---\n"
-        results_text += f"Title: {result.get('title', 'N/A')}\n"
-        results_text += f"URL: {result.get('url', 'N/A')}\n"
-        content = result.get('content', 'N/A')
-        # Truncate long content
-        if len(content) > 1200:
-            content = content[:1200] + "..."
-        results_text += f"Content: {content}\n"
+    # Coordinates spelled out in a snippet need no LLM call, unless the
+    # caller also wants company/status fields only the LLM can provide
+    if not extract_companies and not extract_status:
+        parsed = find_coordinates_in_results(facility_name, search_results)
+        if parsed:
+            logger.debug(f"Coordinates for {facility_name} parsed from {parsed.source_url}")
+            return parsed
 
     commodity_str = ", ".join(commodities[:3]) if commodities else "unknown"
 
@@ -182,44 +570,106 @@ STATUS RULES:
 - "development" = under construction or planned
 - "unknown" = no clear status information"""
 
-    prompt = f"""Extract location information for this mining facility from the search results.
+    template = f"""Extract location information for this mining facility from the search results.
 
 FACILITY: {facility_name}
 COUNTRY: {country}
 COMMODITIES: {commodity_str}
 
 SEARCH RESULTS:
-{results_text}
+{{results_text}}
 
 Return JSON with:
 {extraction_schema}
 {instructions}"""
 
+    # Pre-flight token count: fill whatever budget the fixed parts leave
+    overhead = count_tokens(SYSTEM_PROMPT, model) + count_tokens(template, model)
+    budget = MAX_PROMPT_TOKENS - RESERVED_OUTPUT_TOKENS - overhead
+    results_text = _fit_results(search_results, budget, model)
+    if not results_text:
+        logger.warning(f"No search results fit the prompt budget for {facility_name}")
+        return None
+    prompt = template.replace("{results_text}", results_text, 1)
+    logger.debug(f"Extraction prompt for {facility_name}: {overhead} fixed + "
+                 f"{count_tokens(results_text, model)} result tokens")
+
+    if cache:
+        data = cache.get(model, prompt)
+        if data is not None:
+            logger.debug(f"LLM extraction served from cache: {facility_name}")
+            return ExtractionResult.from_dict(data)
+
     try:
-        response = client.chat.completions.create(
+        response = _create_completion(
+            client,
             model=model,
             messages=[
                 {
                     "role": "system",
-                    "content": "You are an expert at extracting geographic coordinates from mining reports and technical documents. Be precise with coordinate signs (negative for South/West)."
+                    "content": SYSTEM_PROMPT
                 },
                 {"role": "user", "content": prompt}
             ],
-            response_format={"type": "json_object"},
+            response_format=_response_schema(extract_companies, extract_status),
+            max_tokens=RESERVED_OUTPUT_TOKENS,
             temperature=0.0
         )
+        if usage is not None:
+            usage.add(getattr(response, 'usage', None), model)
         data = json.loads(response.choices[0].message.content)
+        if cache:
+            cache.set(model, prompt, data)
         return ExtractionResult.from_dict(data)
     except Exception as e:
         logger.error(f"LLM extraction error: {e}")
         return None
 
 
+def _nominatim_town(query: str) -> Optional[Tuple[float, float]]:
+    """Geocode a town via Nominatim, spaced by the shared nominatim_wait limiter."""
+    from geopy.geocoders import Nominatim
+    from .geocoding import nominatim_wait
+
+    nominatim_wait(NOMINATIM_DELAY_S)
+    location = Nominatim(user_agent=NOMINATIM_USER_AGENT).geocode(query, timeout=10)
+    return (location.latitude, location.longitude) if location else None
+
+
+@lru_cache(maxsize=4096)
+def _cached_reference_town(query: str, cache: QueryCache) -> Optional[Tuple[float, float]]:
+    """_nominatim_town through `cache`, memoized per (query, cache) for the process."""
+    cached = cache.get("nominatim", query)
+    if cached is not None:
+        return tuple(cached) if cached else None
+
+    coords = _nominatim_town(query)
+    cache.set("nominatim", query, list(coords) if coords else [])
+    return coords
+
+
+def _geocode_reference_town(
+    query: str,
+    cache: Optional[QueryCache] = None
+) -> Optional[Tuple[float, float]]:
+    """
+    Geocode a reference town, through `cache` when one is given.
+
+    With a cache only misses hit the network, and towns Nominatim cannot
+    find are cached too; request errors propagate and are not cached.
+    Without one every call goes to Nominatim.
+    """
+    if cache is None:
+        return _nominatim_town(query)
+    return _cached_reference_town(query, cache)
+
+
 def calculate_from_reference(
     reference_town: str,
     country: str,
     distance_km: float,
-    direction: str
+    direction: str,
+    cache: Optional[QueryCache] = None
 ) -> Optional[Tuple[float, float]]:
     """
     Calculate coordinates from a reference point using bearing and distance.
@@ -229,37 +679,26 @@ def calculate_from_reference(
         country: Country name for geocoding context
         distance_km: Distance from reference point in kilometers
         direction: Cardinal/intercardinal direction (N, NE, E, SE, S, SW, W, NW, etc.)
+        cache: Optional QueryCache of reference town lookups
 
     Returns:
         Tuple of (latitude, longitude) or None if calculation fails
     """
     try:
-        from geopy.geocoders import Nominatim
         from geopy.distance import distance as geopy_distance
     except ImportError:
         logger.warning("geopy not installed - can't calculate from reference")
         return None
 
-    geolocator = Nominatim(user_agent="gsmc-facility-geocoder")
-    time.sleep(1.1)  # Nominatim rate limit
-
     try:
-        location = geolocator.geocode(f"{reference_town}, {country}", timeout=10)
+        location = _geocode_reference_town(f"{reference_town}, {country}", cache)
         if not location:
             logger.warning(f"Could not geocode reference town: {reference_town}")
             return None
 
-        ref_lat, ref_lon = location.latitude, location.longitude
+        ref_lat, ref_lon = location
 
-        # Direction to bearing mapping
-        bearings = {
-            "N": 0, "NNE": 22.5, "NE": 45, "ENE": 67.5,
-            "E": 90, "ESE": 112.5, "SE": 135, "SSE": 157.5,
-            "S": 180, "SSW": 202.5, "SW": 225, "WSW": 247.5,
-            "W": 270, "WNW": 292.5, "NW": 315, "NNW": 337.5
-        }
-
-        bearing = bearings.get(direction.upper())
+        bearing = BEARINGS.get(direction.strip().upper())
         if bearing is None:
             logger.warning(f"Unknown direction: {direction}")
             return None
@@ -275,7 +714,8 @@ def calculate_from_reference(
 
 def resolve_extraction_coordinates(
     result: ExtractionResult,
-    country: str
+    country: str,
+    town_cache: Optional[QueryCache] = None
 ) -> Optional[Tuple[float, float]]:
     """
     Resolve final coordinates from an extraction result.
@@ -286,6 +726,7 @@ def resolve_extraction_coordinates(
     Args:
         result: ExtractionResult from extract_coordinates()
         country: Country name for reference calculation
+        town_cache: Optional QueryCache of reference town lookups
 
     Returns:
         Tuple of (latitude, longitude) or None
@@ -303,7 +744,8 @@ def resolve_extraction_coordinates(
             result.reference_town,
             country,
             result.distance_km,
-            result.direction
+            result.direction,
+            cache=town_cache
         )
 
     return None
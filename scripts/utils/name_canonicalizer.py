@@ -5,21 +5,28 @@ Includes:
 - Unicode-aware name normalization and slug generation
 - Global slug registry for uniqueness
 - Canonical name generation
+- Column-wise batch canonicalization (canonicalize_many)
 """
 
 from __future__ import annotations
 import re
 import unicodedata
-from collections import defaultdict
-from typing import Dict, Any, Optional, List
+from collections import Counter
+from functools import lru_cache
+from itertools import repeat
+from typing import TYPE_CHECKING, Dict, Any, Iterable, Optional, List, NamedTuple
 
 from scripts.utils.type_map import normalize_type
 
-# Try to import unidecode for transliteration
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# Try to import pyahocorasick for single-pass noise-word matching
 try:
-    from unidecode import unidecode
+    import ahocorasick
 except ImportError:
-    unidecode = None
+    ahocorasick = None
 
 # Try to import pygeohash for geohash computation
 try:
@@ -33,28 +40,81 @@ except ImportError:
 # =============================================================================
 
 def nfc(s: str) -> str:
-    """Normalize string to NFC (canonical composition) form."""
+    """
+    Normalize string to NFC (canonical composition) form.
+
+    unicodedata.normalize already returns ASCII and quick-check-normalized
+    input unchanged without allocating, so no Python-level fast path is
+    layered on top (measured slower).
+    """
     return unicodedata.normalize("NFC", s or "")
 
 
+def _strip_accents(s: str) -> str:
+    """Fallback transliteration: decompose and strip accents."""
+    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+
+
+# unidecode, imported on the first non-ASCII to_ascii call (False if missing)
+_unidecode = None
+
+
+def _get_unidecode():
+    """Return unidecode.unidecode, or None if it is not installed."""
+    global _unidecode
+    if _unidecode is None:
+        try:
+            from unidecode import unidecode as _unidecode
+        except ImportError:
+            _unidecode = False
+    return _unidecode or None
+
+
+# Both unidecode and the NFKD fallback map code points independently, so the
+# Latin-1 Supplement and Latin Extended-A/B blocks (where nearly all accented
+# facility names live) can be transliterated with a single str.translate call.
+_LATIN_MAX = "\u024f"
+
+
+@lru_cache(maxsize=1)
+def _latin_to_ascii() -> Dict[int, str]:
+    """Translate table for U+0080..U+024F, built on first use."""
+    translit = _get_unidecode() or _strip_accents
+    return str.maketrans({cp: translit(chr(cp)) for cp in range(0x80, 0x250)})
+
+
+@lru_cache(maxsize=4096)
 def to_ascii(s: str) -> str:
-    """Convert Unicode string to ASCII equivalent."""
+    """Convert Unicode string to ASCII equivalent (memoized: operators and towns recur)."""
     s = nfc(s)
-    if unidecode:
-        s = unidecode(s)
-    else:
-        # Fallback: decompose and strip accents
-        s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-    return s
+    if s.isascii():
+        return s
+    if max(s) <= _LATIN_MAX:
+        return s.translate(_latin_to_ascii())
+    translit = _get_unidecode()
+    if translit:
+        return translit(s)
+    return _strip_accents(s)
+
+
+# Byte table mapping everything except [a-z0-9] to "-"
+_SLUG_BYTES = bytes(c if (0x61 <= c <= 0x7a or 0x30 <= c <= 0x39) else 0x2d for c in range(256))
+
+
+def _ascii_slug(*ascii_parts: str) -> str:
+    """Slug from parts that have already been through to_ascii."""
+    base = " ".join(ascii_parts).lower()
+    # Pure ASCII: classify bytes via the table, then collapse runs of "-"
+    # and trim the ends in one split/join
+    base = base.encode("ascii").translate(_SLUG_BYTES).decode("ascii")
+    base = "-".join(filter(None, base.split("-")))
+    return base or "facility"
 
 
 def slugify(*parts: str) -> str:
     """Create URL-safe slug from parts, handling Unicode properly."""
     txt = " ".join([p for p in map(nfc, parts) if p])
-    base = to_ascii(txt).lower()
-    base = re.sub(r"[^a-z0-9]+", "-", base).strip("-")
-    base = re.sub(r"-{2,}", "-", base)
-    return base or "facility"
+    return _ascii_slug(to_ascii(txt))
 
 
 def equal_ignoring_accents(a: str, b: str) -> bool:
@@ -68,11 +128,17 @@ def equal_ignoring_accents(a: str, b: str) -> bool:
 # Slug Registry (formerly slug_registry.py)
 # =============================================================================
 
+_NON_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
 def _slugify_suffix(s: str) -> str:
     """Helper to slugify disambiguation suffixes."""
-    s = (s or "").lower().strip()
-    s = re.sub(r"[^a-z0-9]+", "-", s).strip("-")
-    return s
+    s = (s or "").lower()
+    if s.isascii():
+        # Same byte table as _ascii_slug; regex only for non-ASCII regions
+        s = s.encode("ascii").translate(_SLUG_BYTES).decode("ascii")
+        return "-".join(filter(None, s.split("-")))
+    return _NON_SLUG_RE.sub("-", s).strip("-")
 
 
 class SlugRegistry:
@@ -85,10 +151,14 @@ class SlugRegistry:
         Args:
             preseed: Iterable of existing slugs to register upfront
         """
-        self.seen = defaultdict(int)  # slug -> count
+        self.seen = set()
+        self._counter = {}  # slug -> last numeric suffix used
         for s in preseed:
             if s:
-                self.seen[s] = 1
+                self.seen.add(s)
+
+    def __contains__(self, slug: str) -> bool:
+        return slug in self.seen
 
     def unique(self, slug: str, *, country: Optional[str] = None,
                region: Optional[str] = None, geohash6: Optional[str] = None) -> str:
@@ -105,28 +175,60 @@ class SlugRegistry:
             Unique slug, potentially with suffix
         """
         if slug not in self.seen:
-            self.seen[slug] = 1
+            self.seen.add(slug)
             return slug
 
         # Deterministic disambiguation: region -> geohash6 -> numeric suffix
         for suffix in filter(None, [region, geohash6]):
             s = f"{slug}-{_slugify_suffix(suffix)}"
             if s not in self.seen:
-                self.seen[s] = 1
+                self.seen.add(s)
                 return s
 
         # Last resort: numeric suffix
-        i = self.seen[slug] + 1
-        self.seen[slug] = i
+        i = self._counter.get(slug, 1) + 1
+        self._counter[slug] = i
         unique_slug = f"{slug}-{i}"
-        self.seen[unique_slug] = 1
+        self.seen.add(unique_slug)
         return unique_slug
 
+    def unique_many(self, slugs: List[str],
+                    meta: Optional[Iterable[Dict[str, Any]]] = None) -> List[str]:
+        """
+        Batch form of unique(), with identical results.
+
+        When no slug repeats within the batch or is already registered (the
+        common case), the whole batch is registered with one set update.
+        Otherwise slugs are registered in order, and only those already seen
+        go through unique()'s disambiguation.
+
+        Args:
+            slugs: Base slugs
+            meta: Optional per-slug keyword arguments for unique()
+                  (country, region, geohash6). May be a lazy iterable: item
+                  i is only pulled right before slug i is registered.
+
+        Returns:
+            Unique slugs, aligned with the input
+        """
+        counts = Counter(slugs)
+        if len(counts) == len(slugs) and self.seen.isdisjoint(counts):
+            self.seen.update(counts)
+            return list(slugs)
+
+        seen = self.seen
+        out = []
+        for slug, kwargs in zip(slugs, meta if meta is not None else repeat({})):
+            if slug in seen:
+                slug = self.unique(slug, **kwargs)
+            else:
+                seen.add(slug)
+            out.append(slug)
+        return out
+
     def load_existing(self, slugs: list[str]):
         """Pre-load registry with existing slugs to avoid collisions."""
-        for slug in slugs:
-            if slug:
-                self.seen[slug] = 1
+        self.seen.update(slug for slug in slugs if slug)
 
 
 # =============================================================================
@@ -143,6 +245,64 @@ NOISE_WORDS = {
     "smelter", "refinery", "concentrator", "sx-ew", "sxew", "hydromet", "works"
 }
 
+# Longest first so multi-word phrases ("open pit") go before their parts
+_NOISE_WORDS_SORTED = tuple(sorted(NOISE_WORDS, key=lambda w: (-len(w), w)))
+
+# All noise words in one longest-first alternation: a single scan per name
+_NOISE_RE = re.compile(
+    r"\b(?:" + "|".join(map(re.escape, _NOISE_WORDS_SORTED)) + r")\b", re.IGNORECASE
+)
+
+# Same word set as an Aho-Corasick automaton (values are word lengths)
+if ahocorasick:
+    _NOISE_AUTOMATON = ahocorasick.Automaton()
+    for _word in NOISE_WORDS:
+        _NOISE_AUTOMATON.add_word(_word, len(_word))
+    _NOISE_AUTOMATON.make_automaton()
+else:
+    _NOISE_AUTOMATON = None
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _strip_noise(s: str) -> str:
+    """
+    Replace noise words with spaces; same result as _NOISE_RE.sub(" ", s).
+
+    ASCII names go through the automaton when pyahocorasick is installed:
+    one pass collects every occurrence, and the word-boundary checks and
+    leftmost-longest selection are replayed on the spans. Non-ASCII names keep the
+    regex, since lower() may change offsets and IGNORECASE folds more
+    characters than lower() does.
+    """
+    if _NOISE_AUTOMATON is None or not s.isascii():
+        return _NOISE_RE.sub(" ", s)
+
+    low = s.lower()
+    n = len(low)
+    spans = []
+    for end, length in _NOISE_AUTOMATON.iter(low):
+        start = end - length + 1
+        if (start == 0 or not _is_word_char(low[start - 1])) and \
+                (end + 1 == n or not _is_word_char(low[end + 1])):
+            spans.append((start, end + 1))
+    if not spans:
+        return s
+
+    spans.sort(key=lambda span: (span[0], -span[1]))
+    out = []
+    pos = 0
+    for start, stop in spans:
+        if start < pos:
+            continue
+        out.append(s[pos:start])
+        out.append(" ")
+        pos = stop
+    out.append(s[pos:])
+    return "".join(out)
+
 # Town selection preference order (deterministic)
 TOWN_PREF_ORDER = ("town", "city", "municipality", "village", "hamlet")
 
@@ -153,40 +313,52 @@ def compute_geohash6(lat: Optional[float], lon: Optional[float]) -> Optional[str
         return None
     if pygeohash:
         try:
-            return pygeohash.encode(lat, lon)[:6]
+            return pygeohash.encode(lat, lon, precision=6)
         except:
             return None
     return None
 
 
+@lru_cache(maxsize=256)
 def humanize_type(type_str: str) -> str:
-    """Convert snake_case type to Title Case."""
+    """Convert snake_case type to Title Case (memoized; types are a small vocabulary)."""
     if not type_str or type_str == "facility":
         return ""
     return type_str.replace("_", " ").title()
 
 
+_PAREN_RE = re.compile(r"\([^)]*\)")
+
+
+@lru_cache(maxsize=512)
+def _operator_re(operator: str) -> re.Pattern:
+    """Compiled word-boundary pattern for an operator name (shared across facilities)."""
+    return re.compile(rf"\b{re.escape(operator)}\b", re.IGNORECASE)
+
+
 def extract_core_name(name: str, operator: Optional[str] = None) -> str:
     """Extract core facility name by removing company names and noise."""
     if not name:
         return ""
+    return _extract_core(nfc(name), operator)
 
-    s = nfc(name)
+
+def _extract_core(name: str, operator: Optional[str]) -> str:
+    """extract_core_name for NFC input; the result is NFC as well."""
+    s = name
 
     # Remove parentheticals (often contain towns)
-    s = re.sub(r"\([^)]*\)", " ", s)
+    s = _PAREN_RE.sub(" ", s)
 
     # Remove operator name if present
     if operator:
-        operator_norm = re.escape(operator)
-        s = re.sub(rf"\b{operator_norm}\b", " ", s, flags=re.IGNORECASE)
+        s = _operator_re(operator).sub(" ", s)
 
     # Remove noise words
-    for word in sorted(NOISE_WORDS, key=len, reverse=True):
-        s = re.sub(rf"\b{re.escape(word)}\b", " ", s, flags=re.IGNORECASE)
+    s = _strip_noise(s)
 
     # Collapse whitespace
-    s = re.sub(r"\s+", " ", s).strip()
+    s = " ".join(s.split())
 
     return s or name.strip()
 
@@ -200,8 +372,148 @@ def choose_town_from_address(addr: Dict[str, Any]) -> Optional[str]:
     return None
 
 
+class CanonicalComponents(NamedTuple):
+    """
+    Per-facility canonicalization output.
+
+    Tuple-backed (no per-instance __dict__) so batch canonicalization can hold
+    one per row cheaply; as_result() expands it into the public result dict.
+    """
+    canonical_name: str
+    display_name: str
+    canonical_slug: str
+    town: str
+    operator_display: str
+    core: str
+    primary_type: str
+    type_confidence: float
+    town_score: float
+    core_score: float
+    operator_score: float
+    confidence: float
+
+    def as_result(self) -> Dict[str, Any]:
+        """Expand into the dict returned by canonicalize_facility."""
+        return {
+            "canonical_name": self.canonical_name or None,
+            "display_name": self.display_name or None,
+            "canonical_slug": self.canonical_slug,
+            "primary_type": self.primary_type,
+            "type_confidence": self.type_confidence,
+            "canonicalization_confidence": self.confidence,
+            "canonicalization_detail": {
+                "town": self.town_score,
+                "core": self.core_score,
+                "type": self.type_confidence,
+                "operator": self.operator_score,
+                "parts": (bool(self.town) + bool(self.core) + bool(self.primary_type)) / 3.0
+            },
+            "canonical_components": {
+                "town": self.town or None,
+                "operator_display": self.operator_display or None,
+                "core": self.core,
+                "primary_type": self.primary_type
+            }
+        }
+
+
+def build_canonical_components(
+    *,
+    name: str,
+    town: str,
+    region: str,
+    lat: Optional[float],
+    lon: Optional[float],
+    primary_type: str,
+    type_conf: float,
+    operator: str,
+    country: Optional[str],
+    display_override: Optional[str],
+    register: bool = True,
+) -> CanonicalComponents:
+    """
+    Shared per-facility canonicalization step.
+
+    String inputs must already be NFC-normalized. Registers the resulting
+    slug in the global SLUGS registry; with register=False the base slug is
+    returned unregistered so the caller can register a batch at once.
+    """
+    # Extract core name. Matches are replaced with spaces, never spliced
+    # together, so NFC input gives NFC output without renormalizing.
+    core = _extract_core(name, operator) if name else ""
+
+    # Transliterate once; the ASCII forms feed both the dedupe check and
+    # the slug
+    core_ascii = to_ascii(core)
+    town_ascii = to_ascii(town) if town else ""
+
+    # Dedupe: drop town/operator if they equal core (equal_ignoring_accents,
+    # with core's folded key computed once)
+    if core:
+        core_key = core_ascii.lower().strip()
+        if town and town_ascii.lower().strip() == core_key:
+            town = town_ascii = ""
+        if operator and to_ascii(operator).lower().strip() == core_key:
+            operator = ""
+
+    # Build canonical name (with operator if present)
+    parts = [p for p in [town, operator, core, humanize_type(primary_type)] if p]
+    canonical_name = " ".join(parts)
+
+    # Build slug (NO operator for stability)
+    base_slug = _ascii_slug(town_ascii, core_ascii, to_ascii(primary_type))
+    if register:
+        # Geohash is only used to disambiguate collisions
+        geohash6 = compute_geohash6(lat, lon) if base_slug in SLUGS else None
+        canonical_slug = SLUGS.unique(
+            base_slug,
+            country=country,
+            region=region or None,
+            geohash6=geohash6
+        )
+    else:
+        canonical_slug = base_slug
+
+    # Display name = Core (unless overridden)
+    display_name = display_override or core
+
+    # Calculate confidence scores
+    town_score = 1.0 if town else 0.0
+    core_score = 0.9 if core and core != name else 0.6
+    operator_score = 1.0 if operator else 0.0
+
+    # Overall confidence
+    conf = (
+        0.15 * town_score +
+        0.35 * core_score +
+        0.30 * type_conf +
+        0.20 * operator_score
+    )
+    conf = max(0.0, min(1.0, conf))
+
+    return CanonicalComponents(
+        canonical_name=canonical_name,
+        display_name=display_name,
+        canonical_slug=canonical_slug,
+        town=town,
+        operator_display=operator,
+        core=core,
+        primary_type=primary_type,
+        type_confidence=type_conf,
+        town_score=town_score,
+        core_score=core_score,
+        operator_score=operator_score,
+        confidence=conf,
+    )
+
+
 class FacilityNameCanonicalizer:
-    """Generates canonical facility names for standardization."""
+    """
+    Generates canonical facility names for standardization.
+
+    Input strings are NFC-normalized once, on the way in; everything below
+    (core extraction, dedupe, slugs) relies on that and does not renormalize.
+    """
 
     def canonicalize_facility(
         self,
@@ -220,7 +532,7 @@ class FacilityNameCanonicalizer:
         """
         # Gather inputs
         name = nfc(fac.get("name", ""))
-        loc = fac.get("location", {}) or {}
+        loc = fac.get("location") or {}
         town = nfc(loc.get("town") or "")
         region = nfc(loc.get("region") or "")
         lat, lon = loc.get("lat"), loc.get("lon")
@@ -236,77 +548,169 @@ class FacilityNameCanonicalizer:
         # Get operator
         operator = nfc(fac.get("operator_display") or "")
 
-        # Extract core name
-        core = extract_core_name(name, operator)
-        core = nfc(core)
+        display_override = None
+        if fac.get("display_name_override") and fac.get("display_name"):
+            display_override = fac["display_name"]
+
+        return build_canonical_components(
+            name=name,
+            town=town,
+            region=region,
+            lat=lat,
+            lon=lon,
+            primary_type=primary_type,
+            type_conf=type_conf,
+            operator=operator,
+            country=fac.get("country_iso3"),
+            display_override=display_override,
+        ).as_result()
 
-        # Dedupe: drop town/operator if they equal core
-        if town and equal_ignoring_accents(town, core):
-            town = ""
-        if operator and equal_ignoring_accents(operator, core):
-            operator = ""
+    def canonicalize_batch(self, table: "pa.Table") -> "pa.Table":
+        """
+        Canonicalize an Arrow table of facilities column-wise.
 
-        # Build canonical name (with operator if present)
-        parts = [p for p in [town, operator, core, humanize_type(primary_type)] if p]
-        canonical_name = " ".join(parts)
+        The free-text columns are NFC-normalized in Arrow with
+        pyarrow.compute.utf8_normalize. The rest is canonicalize_many: core
+        name extraction and slugify need unidecode and Python's Unicode-aware
+        regexes, which pyarrow.compute has no equivalent for. See
+        canonicalize_many for the recognized columns and output layout.
 
-        # Build slug (NO operator for stability)
-        base_slug = slugify(town, core, primary_type)
-        geohash6 = compute_geohash6(lat, lon)
-        canonical_slug = SLUGS.unique(
-            base_slug,
-            country=fac.get("country_iso3"),
-            region=region or None,
-            geohash6=geohash6
-        )
+        Args:
+            table: Flat facility table, one column per field
 
-        # Display name = Core (unless overridden)
-        if fac.get("display_name_override") and fac.get("display_name"):
-            display_name = fac["display_name"]
-        else:
-            display_name = core
-
-        # Calculate confidence scores
-        town_score = 1.0 if town else 0.0
-        core_score = 0.9 if core and core != name else 0.6
-        operator_score = 1.0 if operator else 0.0
-
-        # Overall confidence
-        conf = (
-            0.15 * town_score +
-            0.35 * core_score +
-            0.30 * type_conf +
-            0.20 * operator_score
+        Returns:
+            Arrow table with one output row per input row
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        for key in _NFC_COLUMNS:
+            i = table.schema.get_field_index(key)
+            if i >= 0 and pa.types.is_string(table.schema.field(i).type):
+                table = table.set_column(i, key, pc.utf8_normalize(table.column(i), "NFC"))
+
+        result = canonicalize_many(table.to_pandas())
+        return pa.Table.from_pandas(result, preserve_index=False)
+
+
+# Free-text columns canonicalize_many normalizes to NFC
+_NFC_COLUMNS = ("name", "town", "region", "operator_display")
+
+
+def _nfc_column(values: List[Any]) -> List[str]:
+    """NFC-normalize a column of strings, once per distinct value."""
+    cache: Dict[Any, str] = {}
+    out = []
+    for v in values:
+        if v not in cache:
+            cache[v] = nfc(v)
+        out.append(cache[v])
+    return out
+
+
+def canonicalize_many(df: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    Canonicalize a table of facilities column-wise.
+
+    Column-level work (NFC normalization, type normalization) runs once per
+    distinct value instead of once per facility, and slugs are registered
+    with one SlugRegistry.unique_many call. Only core name extraction runs
+    per row, and each row is held as a CanonicalComponents tuple rather than
+    a result dict. Results match canonicalize_facility row for row, and
+    slugs are registered in the global SLUGS registry in row order.
+
+    Args:
+        df: Flat facility table. Recognized columns (missing ones are treated
+            as empty): name, types, primary_type, type_confidence,
+            operator_display, town, region, lat, lon, country_iso3,
+            display_name, display_name_override
+
+    Returns:
+        DataFrame aligned with df's index, with columns canonical_name,
+        display_name, canonical_slug, primary_type, type_confidence,
+        canonicalization_confidence
+    """
+    import pandas as pd
+
+    n = len(df)
+
+    def column(key: str) -> List[Any]:
+        if key not in df.columns:
+            return [None] * n
+        # Missing cells come back as NaN; treat them like absent dict keys
+        return [None if isinstance(v, float) and v != v else v for v in df[key].tolist()]
+
+    names = _nfc_column(column("name"))
+    towns = _nfc_column(column("town"))
+    regions = _nfc_column(column("region"))
+    operators = _nfc_column(column("operator_display"))
+
+    # Type normalization: one normalize_type call per distinct raw type
+    type_cache: Dict[Any, Any] = {}
+    primary_types: List[str] = []
+    type_confs: List[float] = []
+    for pt, tc, types in zip(column("primary_type"), column("type_confidence"), column("types")):
+        if pt:
+            primary_types.append(pt)
+            type_confs.append(0.9 if tc is None else tc)
+            continue
+        raw = types[0] if types is not None and len(types) else None
+        if raw not in type_cache:
+            type_cache[raw] = normalize_type(raw)
+        pt, tc = type_cache[raw]
+        primary_types.append(pt)
+        type_confs.append(tc)
+
+    displays = column("display_name")
+    overrides = column("display_name_override")
+
+    lats, lons, countries = column("lat"), column("lon"), column("country_iso3")
+
+    rows = [
+        build_canonical_components(
+            name=name,
+            town=town,
+            region=region,
+            lat=lat,
+            lon=lon,
+            primary_type=pt,
+            type_conf=tc,
+            operator=operator,
+            country=country,
+            display_override=display if override and display else None,
+            register=False,
         )
-        conf = max(0.0, min(1.0, conf))
-
-        # Detail scores
-        detail = {
-            "town": town_score,
-            "core": core_score,
-            "type": type_conf,
-            "operator": operator_score,
-            "parts": sum(1 for x in [town, core, primary_type] if x) / 3.0
-        }
-
-        # Components for debugging
-        components = {
-            "town": town or None,
-            "operator_display": operator or None,
-            "core": core,
-            "primary_type": primary_type
-        }
-
-        return {
-            "canonical_name": canonical_name or None,
-            "display_name": display_name or None,
-            "canonical_slug": canonical_slug,
-            "primary_type": primary_type,
-            "type_confidence": type_conf,
-            "canonicalization_confidence": conf,
-            "canonicalization_detail": detail,
-            "canonical_components": components
+        for name, town, region, lat, lon, pt, tc, operator, country, display, override in zip(
+            names, towns, regions, lats, lons, primary_types, type_confs,
+            operators, countries, displays, overrides,
+        )
+    ]
+
+    # Register the whole batch at once. meta is a generator that unique_many
+    # consumes in step with registration, so the geohash is still computed
+    # only for slugs that are already taken at that point.
+    base_slugs = [r.canonical_slug for r in rows]
+    meta = (
+        {
+            "country": country,
+            "region": region or None,
+            "geohash6": compute_geohash6(lat, lon) if base_slug in SLUGS else None,
         }
+        for base_slug, country, region, lat, lon in zip(base_slugs, countries, regions, lats, lons)
+    )
+    slugs = SLUGS.unique_many(base_slugs, meta)
+
+    return pd.DataFrame(
+        {
+            "canonical_name": [r.canonical_name or None for r in rows],
+            "display_name": [r.display_name or None for r in rows],
+            "canonical_slug": slugs,
+            "primary_type": [r.primary_type for r in rows],
+            "type_confidence": [r.type_confidence for r in rows],
+            "canonicalization_confidence": [r.confidence for r in rows],
+        },
+        index=df.index,
+    )
 
 
 # Convenience function
@@ -27,11 +27,32 @@ Usage:
     )
 """
 
+import random
+import re
 import time
 import logging
+import threading
 import requests
-from typing import List, Dict, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from pathlib import Path
+from typing import List, Dict, Iterable, Iterator, Optional, Any, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
+
+from .query_cache import QueryCache
+
+# Try to import orjson for faster decoding of large responses
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Try to import ijson for streaming large responses element by element
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
@@ -44,12 +65,106 @@ OVERPASS_ENDPOINTS = [
 
 # Rate limiting (conservative for community instances)
 RATE_LIMIT = 0.5  # seconds between requests
-LAST_REQUEST_TIME = 0
+# Per-endpoint (lock, [last request time]); clients sharing an endpoint share
+# its spacing, different endpoints proceed independently
+_RATE_LIMIT_BUCKETS: Dict[str, Tuple[threading.Lock, List[float]]] = {}
+
+# ISO3 -> ISO2 for Overpass area lookups (uses ISO3166-1:alpha2)
+ISO3_TO_ISO2 = {
+    'KAZ': 'KZ', 'USA': 'US', 'ZAF': 'ZA', 'AUS': 'AU',
+    'CHL': 'CL', 'PER': 'PE', 'CHN': 'CN', 'IND': 'IN',
+    # Add more mappings as needed
+}
+
+# Common resource names -> OSM resource tag values
+RESOURCE_TAGS = {
+    'copper': 'copper',
+    'cu': 'copper',
+    'gold': 'gold',
+    'au': 'gold',
+    'uranium': 'uranium',
+    'u': 'uranium',
+    'iron': 'iron',
+    'iron ore': 'iron_ore',
+    'fe': 'iron',
+    'coal': 'coal',
+    'platinum': 'platinum',
+    'pt': 'platinum',
+    'lithium': 'lithium',
+    'li': 'lithium',
+    'nickel': 'nickel',
+    'ni': 'nickel',
+    'zinc': 'zinc',
+    'zn': 'zinc',
+    'lead': 'lead',
+    'pb': 'lead',
+    'silver': 'silver',
+    'ag': 'silver'
+}
+
+# Approximate country extents (south, west, north, east), rounded outward,
+# used to clip caller bounding boxes before querying. Countries missing
+# here are queried unclipped. Countries crossing the antimeridian (USA
+# via the Aleutians, RUS, FJI, NZL, KIR) have no single west/east pair
+# and are left out.
+COUNTRY_EXTENTS = {
+    'KAZ': (40.0, 46.0, 56.0, 88.0),
+    'ZAF': (-47.5, 16.0, -22.0, 38.5),
+    'AUS': (-55.0, 112.5, -9.0, 159.5),
+    'CHL': (-56.5, -110.0, -17.0, -66.0),
+    'PER': (-18.5, -81.5, 0.0, -68.5),
+    'CHN': (15.0, 73.0, 54.0, 135.5),
+    'IND': (6.0, 68.0, 37.5, 97.5),
+}
+
+# Responses that mean "this instance is overloaded, try another"
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+# Retries after the first attempt; once every endpoint has failed, each
+# further retry waits 2**n seconds (capped) plus jitter
+MAX_RETRIES = 6
+BACKOFF_MAX = 60.0  # seconds
+
+# Failures while reading a streamed body: the connection dropped or stalled
+# mid-response, leaving truncated JSON. Raised outside requests' wrappers.
+STREAM_ERRORS = (ReadTimeoutError, ProtocolError) + ((ijson.JSONError,) if ijson else ())
+
+# Allowed gap between consecutive words of a name search. Overpass uses
+# POSIX extended regexes, so a bounded repeat rather than a lazy '.*?'
+NAME_WORD_GAP = '.{0,20}'
+
+
+def _watch_remark(events: Iterable[Tuple[str, str, Any]], remarks: List[str]) -> Iterator[Tuple[str, str, Any]]:
+    """Pass ijson parse events through, recording the top-level 'remark'."""
+    for prefix, event, value in events:
+        if prefix == 'remark' and event == 'string':
+            remarks.append(value)
+        yield prefix, event, value
+
+
+@lru_cache(maxsize=256)
+def _mining_query_head(timeout: int, area_statement: Optional[str], area_filter: str) -> str:
+    """Invariant start of a mining query: header, area and fixed clauses."""
+    lines = [f'[out:json][timeout:{timeout}];']
+    if area_statement:
+        lines.append(area_statement)
+    lines.append('(')
+
+    # Mining infrastructure
+    lines.append(f'node{area_filter}["man_made"~"mineshaft|adit"];')
+    lines.append(f'way{area_filter}["man_made"~"mineshaft|adit"];')
+
+    # Quarries
+    lines.append(f'way{area_filter}["landuse"="quarry"];')
+
+    return '\n'.join(lines)
 
 
 @dataclass
 class OSMFeature:
     """OSM feature from Overpass API."""
+    __slots__ = ('osm_id', 'osm_type', 'lat', 'lon', 'name', 'tags')
+
     osm_id: str  # e.g., "node/123456" or "way/789012"
     osm_type: str  # 'node', 'way', 'relation'
     lat: float
@@ -65,7 +180,9 @@ class OverpassClient:
     Handles:
     - Query construction for mining features
     - Rate limiting
-    - Error handling and retries
+    - Pooled keep-alive connections (use as a context manager to close them)
+    - On-disk response caching (see query_cache.py)
+    - Endpoint failover and retries with exponential backoff
     - Result parsing
     """
 
@@ -73,7 +190,11 @@ class OverpassClient:
         self,
         endpoint: Optional[str] = None,
         timeout: int = 120,
-        rate_limit: float = RATE_LIMIT
+        rate_limit: float = RATE_LIMIT,
+        use_cache: bool = True,
+        cache_dir: Optional[Path] = None,
+        endpoints: Optional[List[str]] = None,
+        max_retries: int = MAX_RETRIES
     ):
         """
         Initialize Overpass client.
@@ -81,19 +202,52 @@ class OverpassClient:
         Args:
             endpoint: Overpass API endpoint (uses default if None)
             timeout: Query timeout in seconds
-            rate_limit: Minimum seconds between requests
+            rate_limit: Minimum seconds between requests (per endpoint)
+            use_cache: Reuse raw responses cached on disk
+            cache_dir: Query cache root (default: ~/.cache/facilities)
+            endpoints: Endpoints to fail over between on 429/5xx/timeout
+                (default: [endpoint] if given, else OVERPASS_ENDPOINTS)
+            max_retries: Retries per query across endpoints, with backoff
+                once all endpoints have failed
         """
-        self.endpoint = endpoint or OVERPASS_ENDPOINTS[0]
+        if endpoints:
+            self.endpoints = list(endpoints)
+        elif endpoint:
+            self.endpoints = [endpoint]
+        else:
+            self.endpoints = list(OVERPASS_ENDPOINTS)
+        self.endpoint = self.endpoints[0]
         self.timeout = timeout
         self.rate_limit = rate_limit
-
-    def _rate_limit_wait(self):
-        """Wait to respect rate limits."""
-        global LAST_REQUEST_TIME
-        elapsed = time.time() - LAST_REQUEST_TIME
-        if elapsed < self.rate_limit:
-            time.sleep(self.rate_limit - elapsed)
-        LAST_REQUEST_TIME = time.time()
+        self.max_retries = max_retries
+        self.cache = QueryCache("overpass", cache_dir) if use_cache else None
+        # One keep-alive session: repeat queries skip the TCP/TLS handshake.
+        # Retries are handled in query (endpoint failover and backoff), so
+        # the adapter only sizes the connection pool.
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'FacilitiesGeocodingBot/1.0'
+        self.session.mount('https://', HTTPAdapter(pool_connections=len(self.endpoints)))
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _rate_limit_wait(self, endpoint: Optional[str] = None):
+        """Wait to respect rate limits for an endpoint (default: self.endpoint)."""
+        lock, last = _RATE_LIMIT_BUCKETS.setdefault(
+            endpoint or self.endpoint, (threading.Lock(), [float('-inf')])
+        )
+        with lock:
+            elapsed = time.monotonic() - last[0]
+            if elapsed < self.rate_limit:
+                time.sleep(self.rate_limit - elapsed)
+            last[0] = time.monotonic()
 
     def _build_mining_query(
         self,
@@ -115,59 +269,80 @@ class OverpassClient:
             Overpass QL query string
         """
         # Convert ISO3 to ISO2 for Overpass (uses ISO3166-1:alpha2)
-        iso2_map = {
-            'KAZ': 'KZ', 'USA': 'US', 'ZAF': 'ZA', 'AUS': 'AU',
-            'CHL': 'CL', 'PER': 'PE', 'CHN': 'CN', 'IND': 'IN',
-            # Add more mappings as needed
-        }
-        iso2 = iso2_map.get(country_iso3, country_iso3[:2])
+        iso2 = ISO3_TO_ISO2.get(country_iso3, country_iso3[:2])
 
-        query_parts = [
-            f'[out:json][timeout:{self.timeout}];'
-        ]
+        # A bbox covering the whole country adds nothing over the area
+        # filter; otherwise search only the part inside the country
+        if bbox:
+            bbox = self._clip_bbox(country_iso3, bbox)
 
         # Define area (country or bbox)
         if bbox:
             south, west, north, east = bbox
+            area_statement = None
             area_filter = f'({south},{west},{north},{east})'
         else:
-            query_parts.append(f'area["ISO3166-1"="{iso2}"]->.searchArea;')
+            area_statement = f'area["ISO3166-1"="{iso2}"]->.searchArea;'
             area_filter = '(area.searchArea)'
 
-        # Build feature queries
-        features = []
-
-        # Mining infrastructure
-        features.append(f'node{area_filter}["man_made"~"mineshaft|adit"];')
-        features.append(f'way{area_filter}["man_made"~"mineshaft|adit"];')
-
-        # Quarries
-        features.append(f'way{area_filter}["landuse"="quarry"];')
+        # Header, area and the fixed mining clauses come from the cache;
+        # only the resource and name clauses vary per call
+        query_parts = [_mining_query_head(self.timeout, area_statement, area_filter)]
 
         # Resource-specific (if specified)
         if resource:
             resource_tag = self._normalize_resource_tag(resource)
-            features.append(f'nwr{area_filter}["resource"="{resource_tag}"];')
+            query_parts.append(f'nwr{area_filter}["resource"="{resource_tag}"];')
         else:
             # All resources
-            features.append(f'nwr{area_filter}["resource"];')
+            query_parts.append(f'nwr{area_filter}["resource"];')
 
         # Name search (if specified)
         if facility_name:
             # Create regex-safe search term
             search_term = self._create_name_regex(facility_name)
-            features.append(f'nwr{area_filter}["name"~"{search_term}",i];')
-
-        # Combine features
-        query_parts.append('(')
-        query_parts.extend(features)
-        query_parts.append(');')
+            query_parts.append(f'nwr{area_filter}["name"~"{search_term}",i];')
 
-        # Output with center coordinates for ways/relations
-        query_parts.append('out center tags;')
+        # Close the union; output with center coordinates for ways/relations
+        query_parts.append(');\nout center tags;')
 
         return '\n'.join(query_parts)
 
+    def _clip_bbox(self, country_iso3: str, bbox: tuple) -> Optional[tuple]:
+        """
+        Intersect a bounding box with the country's extent.
+
+        Args:
+            country_iso3: ISO3 country code
+            bbox: Bounding box (south, west, north, east)
+
+        Returns:
+            Clipped bbox; None if it covers the whole country extent; the
+            bbox unchanged if the extent is unknown or does not overlap it
+        """
+        extent = COUNTRY_EXTENTS.get(country_iso3)
+        if not extent:
+            return bbox
+
+        south, west, north, east = bbox
+        c_south, c_west, c_north, c_east = extent
+        if south <= c_south and west <= c_west and north >= c_north and east >= c_east:
+            return None
+
+        clipped = (max(south, c_south), max(west, c_west), min(north, c_north), min(east, c_east))
+        if clipped[0] > clipped[2] or clipped[1] > clipped[3]:
+            return bbox
+        return clipped
+
+    def _bbox_outside_country(self, country_iso3: str, bbox: Optional[tuple]) -> bool:
+        """Whether a bbox cannot contain anything in the country."""
+        extent = COUNTRY_EXTENTS.get(country_iso3)
+        if not bbox or not extent:
+            return False
+        south, west, north, east = bbox
+        return (south > extent[2] or north < extent[0] or
+                west > extent[3] or east < extent[1])
+
     def _normalize_resource_tag(self, resource: str) -> str:
         """
         Normalize resource name to OSM resource tag.
@@ -178,34 +353,8 @@ class OverpassClient:
         Returns:
             OSM resource tag value
         """
-        # Map common resource names to OSM tags
-        resource_map = {
-            'copper': 'copper',
-            'cu': 'copper',
-            'gold': 'gold',
-            'au': 'gold',
-            'uranium': 'uranium',
-            'u': 'uranium',
-            'iron': 'iron',
-            'iron ore': 'iron_ore',
-            'fe': 'iron',
-            'coal': 'coal',
-            'platinum': 'platinum',
-            'pt': 'platinum',
-            'lithium': 'lithium',
-            'li': 'lithium',
-            'nickel': 'nickel',
-            'ni': 'nickel',
-            'zinc': 'zinc',
-            'zn': 'zinc',
-            'lead': 'lead',
-            'pb': 'lead',
-            'silver': 'silver',
-            'ag': 'silver'
-        }
-
         normalized = resource.lower().strip()
-        return resource_map.get(normalized, normalized.replace(' ', '_'))
+        return RESOURCE_TAGS.get(normalized, normalized.replace(' ', '_'))
 
     def _create_name_regex(self, facility_name: str) -> str:
         """
@@ -221,8 +370,9 @@ class OverpassClient:
         words = facility_name.lower().split()
         # Escape special regex characters
         words = [re.escape(w) for w in words]
-        # Join with flexible spacing
-        return '.*'.join(words)
+        # Join with flexible but bounded spacing, so the server-side match
+        # cannot backtrack across arbitrarily long tag values
+        return NAME_WORD_GAP.join(words)
 
     def query(self, overpass_ql: str) -> List[OSMFeature]:
         """
@@ -234,42 +384,99 @@ class OverpassClient:
         Returns:
             List of OSMFeature objects
         """
-        self._rate_limit_wait()
-
-        try:
-            response = requests.post(
-                self.endpoint,
-                data={'data': overpass_ql},
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-
-            data = response.json()
-            elements = data.get('elements', [])
-
-            return self._parse_elements(elements)
+        if self.cache:
+            elements = self.cache.get(self.endpoint, overpass_ql)
+            if elements is not None:
+                logger.debug("Overpass query served from cache")
+                return self._parse_elements(elements)
+
+        # Overloaded or unreachable instances: move on to the next endpoint,
+        # backing off once every endpoint has failed
+        n_endpoints = len(self.endpoints)
+        for attempt in range(self.max_retries + 1):
+            endpoint = self.endpoints[attempt % n_endpoints]
+            if attempt >= n_endpoints:
+                delay = min(BACKOFF_MAX, 2 ** (attempt - n_endpoints)) + random.random()
+                logger.info(f"Overpass retry {attempt}/{self.max_retries} in {delay:.1f}s: {endpoint}")
+                time.sleep(delay)
+            self._rate_limit_wait(endpoint)
+
+            try:
+                response = self.session.post(
+                    endpoint,
+                    data={'data': overpass_ql},
+                    timeout=self.timeout,
+                    stream=ijson is not None
+                )
+                try:
+                    if response.status_code in RETRY_STATUS_CODES:
+                        logger.warning(f"Overpass endpoint busy (HTTP {response.status_code}): {endpoint}")
+                        continue
+                    response.raise_for_status()
+
+                    # A 'remark' (e.g. "runtime error: Query timed out")
+                    # means the elements are partial
+                    remarks: List[str] = []
+                    if ijson:
+                        # Parse elements as they arrive instead of decoding
+                        # the whole (possibly tens of MB) document first.
+                        # The remark follows the elements, so it is only
+                        # known once the stream is exhausted.
+                        response.raw.decode_content = True
+                        events = _watch_remark(ijson.parse(response.raw, use_float=True), remarks)
+                        elements = ijson.items(events, 'elements.item')
+                    else:
+                        data = orjson.loads(response.content) if orjson else response.json()
+                        elements = data.get('elements', [])
+                        if data.get('remark'):
+                            remarks.append(data['remark'])
+
+                    # Cached under the primary endpoint: mirrors serve the
+                    # same data. Partial and empty results are not cached.
+                    if self.cache:
+                        elements = self.cache.tee(
+                            self.endpoint, overpass_ql, elements,
+                            keep=lambda count: count > 0 and not remarks
+                        )
+
+                    features = self._parse_elements(elements)
+                    if remarks:
+                        logger.warning(f"Overpass returned partial results: {remarks[0]}")
+                    return features
+                finally:
+                    response.close()
+
+            except requests.exceptions.Timeout:
+                logger.warning(f"Overpass query timeout ({self.timeout}s): {endpoint}")
+                continue
+            except requests.exceptions.ConnectionError as e:
+                logger.warning(f"Overpass endpoint unreachable: {endpoint} ({e})")
+                continue
+            except STREAM_ERRORS as e:
+                logger.warning(f"Overpass response interrupted: {endpoint} ({e})")
+                continue
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Overpass query failed: {e}")
+                return []
+            except Exception as e:
+                logger.error(f"Unexpected error in Overpass query: {e}")
+                return []
 
-        except requests.exceptions.Timeout:
-            logger.warning(f"Overpass query timeout ({self.timeout}s)")
-            return []
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Overpass query failed: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"Unexpected error in Overpass query: {e}")
-            return []
+        logger.warning(f"Overpass query failed after {self.max_retries + 1} attempts")
+        return []
 
     def _parse_elements(self, elements: List[Dict]) -> List[OSMFeature]:
         """
         Parse Overpass API response elements.
 
         Args:
-            elements: List of elements from Overpass response
+            elements: Elements from Overpass response (list or stream)
 
         Returns:
             List of OSMFeature objects
         """
         features = []
+        append = features.append
 
         for elem in elements:
             osm_type = elem.get('type')
@@ -278,34 +485,18 @@ class OverpassClient:
             if not osm_type or not osm_id:
                 continue
 
-            # Get coordinates
+            # Get coordinates; ways/relations carry them in 'center'
             lat = elem.get('lat')
             lon = elem.get('lon')
-
-            # For ways/relations, use center coordinates
             if lat is None or lon is None:
-                center = elem.get('center', {})
+                center = elem.get('center') or {}
                 lat = center.get('lat')
                 lon = center.get('lon')
+                if lat is None or lon is None:
+                    continue
 
-            if lat is None or lon is None:
-                continue
-
-            # Get tags
             tags = elem.get('tags', {})
-            name = tags.get('name')
-
-            # Create feature
-            feature = OSMFeature(
-                osm_id=f"{osm_type}/{osm_id}",
-                osm_type=osm_type,
-                lat=lat,
-                lon=lon,
-                name=name,
-                tags=tags
-            )
-
-            features.append(feature)
+            append(OSMFeature(f"{osm_type}/{osm_id}", osm_type, lat, lon, tags.get('name'), tags))
 
         return features
 
@@ -328,6 +519,10 @@ class OverpassClient:
         Returns:
             List of OSMFeature objects
         """
+        if self._bbox_outside_country(country_iso3, bbox):
+            logger.debug(f"Overpass bbox {bbox} lies outside {country_iso3}; skipping query")
+            return []
+
         query = self._build_mining_query(
             country_iso3=country_iso3,
             resource=resource,
@@ -339,6 +534,3 @@ class OverpassClient:
 
         return self.query(query)
 
-
-# Import regex for name search
-import re
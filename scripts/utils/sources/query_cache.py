@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+On-disk cache for raw Overpass / Wikidata / web search / LLM responses.
+
+One zlib-compressed JSON file per query, keyed by a hash of the endpoint
+and the full query string, and expired by file age. Repeat geocoding runs
+over the same country/commodity combinations then skip both the HTTP round
+trip and the client-side rate-limit sleep.
+
+Usage:
+    from scripts.utils.sources.query_cache import QueryCache
+
+    cache = QueryCache("overpass")
+    elements = cache.get(endpoint, overpass_ql)
+    if elements is None:
+        elements = ...  # run the query
+        cache.set(endpoint, overpass_ql, elements)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default location and lifetime of cached responses
+QUERY_CACHE_DIR = Path.home() / '.cache' / 'facilities'
+QUERY_CACHE_TTL = 7 * 24 * 3600  # seconds
+
+
+class QueryCache:
+    """
+    File-per-query response cache with a time-to-live.
+
+    Read and write failures are logged and treated as cache misses, so a
+    broken cache directory never stops a query from running.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        cache_dir: Optional[Path] = None,
+        ttl: float = QUERY_CACHE_TTL
+    ):
+        """
+        Initialize query cache.
+
+        Args:
+            namespace: Subdirectory per source (e.g., "overpass", "wikidata")
+            cache_dir: Cache root (default: ~/.cache/facilities)
+            ttl: Maximum age of a cached response in seconds
+        """
+        self.cache_dir = Path(cache_dir or QUERY_CACHE_DIR) / namespace
+        self.ttl = ttl
+
+    @staticmethod
+    def key(endpoint: str, query: str) -> str:
+        """Cache key covering every input that changes the response."""
+        return hashlib.sha256(f"{endpoint}\n{query}".encode("utf-8")).hexdigest()
+
+    def _path(self, endpoint: str, query: str) -> Path:
+        return self.cache_dir / f"{self.key(endpoint, query)}.json.z"
+
+    def get(self, endpoint: str, query: str) -> Optional[Any]:
+        """
+        Return the cached response payload, or None on a miss or expiry.
+
+        Args:
+            endpoint: Endpoint URL the query is sent to
+            query: Full query string
+
+        Returns:
+            Decoded JSON payload or None
+        """
+        path = self._path(endpoint, query)
+        try:
+            if time.time() - path.stat().st_mtime >= self.ttl:
+                return None
+            return json.loads(zlib.decompress(path.read_bytes()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Query cache read failed ({path.name}): {e}")
+            return None
+
+    def set(self, endpoint: str, query: str, payload: Any):
+        """
+        Store a response payload (atomic write).
+
+        Args:
+            endpoint: Endpoint URL the query was sent to
+            query: Full query string
+            payload: JSON-serializable response payload
+        """
+        path = self._path(endpoint, query)
+        tmp_path = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(json.dumps(payload).encode("utf-8")))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"Query cache write failed ({path.name}): {e}")
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def tee(
+        self,
+        endpoint: str,
+        query: str,
+        items: Iterable[Any],
+        keep: Optional[Callable[[int], bool]] = None
+    ) -> Iterator[Any]:
+        """
+        Yield items unchanged while streaming them into the cache.
+
+        The items are written as one JSON array, compressed incrementally,
+        so a streamed response is cached without being held in memory.
+        The entry is committed only once the items are exhausted; a write
+        failure stops caching but not the iteration.
+
+        Args:
+            endpoint: Endpoint URL the query was sent to
+            query: Full query string
+            items: JSON-serializable items (e.g., a streaming parser)
+            keep: Called with the item count once the items are exhausted;
+                the entry is discarded unless it returns True
+        """
+        path = self._path(endpoint, query)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            f = os.fdopen(fd, "wb")
+        except Exception as e:
+            logger.debug(f"Query cache write failed ({path.name}): {e}")
+            yield from items
+            return
+
+        compressor = zlib.compressobj()
+        writing = True
+
+        def write(chunk: bytes):
+            nonlocal writing
+            if writing:
+                try:
+                    f.write(compressor.compress(chunk))
+                except Exception as e:
+                    logger.debug(f"Query cache write failed ({path.name}): {e}")
+                    writing = False
+
+        try:
+            write(b"[")
+            sep = b""
+            count = 0
+            for item in items:
+                write(sep + json.dumps(item).encode("utf-8"))
+                sep = b","
+                count += 1
+                yield item
+            write(b"]")
+            if writing and (keep is None or keep(count)):
+                try:
+                    f.write(compressor.flush())
+                    f.close()
+                    os.replace(tmp_path, path)
+                except OSError as e:
+                    logger.debug(f"Query cache write failed ({path.name}): {e}")
+        finally:
+            f.close()
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
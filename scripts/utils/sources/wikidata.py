@@ -29,12 +29,25 @@ Usage:
     )
 """
 
+import re
 import time
 import logging
+import threading
 import requests
-from typing import List, Dict, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass
 
+from .query_cache import QueryCache
+
+# Try to import orjson for faster decoding of large responses
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 # Wikidata SPARQL endpoint
@@ -42,7 +55,13 @@ SPARQL_ENDPOINT = "https://query.wikidata.org/sparql"
 
 # Rate limiting
 RATE_LIMIT = 0.2  # seconds (5 req/sec)
-LAST_REQUEST_TIME = 0
+# Per-endpoint (lock, [last request time]); clients sharing an endpoint share
+# its spacing, different endpoints proceed independently
+_RATE_LIMIT_BUCKETS: Dict[str, Tuple[threading.Lock, List[float]]] = {}
+
+# Transport-level retries for throttled/unavailable WDQS responses
+# (honours Retry-After)
+HTTP_RETRIES = 3
 
 # Wikidata entity mappings
 WIKIDATA_COUNTRIES = {
@@ -80,9 +99,15 @@ WIKIDATA_COMMODITIES = {
 }
 
 
+# WKT coordinate literal: "Point(lon lat)"
+_WKT_POINT_RE = re.compile(r'Point\(([+-]?\d+\.?\d*)\s+([+-]?\d+\.?\d*)\)')
+
+
 @dataclass
 class WikidataItem:
     """Wikidata item representing a mine or deposit."""
+    __slots__ = ('qid', 'label', 'lat', 'lon', 'aliases', 'properties')
+
     qid: str  # Wikidata QID (e.g., "Q12345")
     label: str
     lat: float
@@ -98,6 +123,8 @@ class WikidataClient:
     Handles:
     - Query construction for mines/deposits
     - Rate limiting
+    - Pooled keep-alive connections (use as a context manager to close them)
+    - On-disk response caching (see query_cache.py)
     - Result parsing
     - Coordinate extraction
     """
@@ -106,7 +133,9 @@ class WikidataClient:
         self,
         endpoint: str = SPARQL_ENDPOINT,
         timeout: int = 30,
-        rate_limit: float = RATE_LIMIT
+        rate_limit: float = RATE_LIMIT,
+        use_cache: bool = True,
+        cache_dir: Optional[Path] = None
     ):
         """
         Initialize Wikidata client.
@@ -115,18 +144,45 @@ class WikidataClient:
             endpoint: SPARQL endpoint URL
             timeout: Query timeout in seconds
             rate_limit: Minimum seconds between requests
+            use_cache: Reuse raw responses cached on disk
+            cache_dir: Query cache root (default: ~/.cache/facilities)
         """
         self.endpoint = endpoint
         self.timeout = timeout
         self.rate_limit = rate_limit
+        self.cache = QueryCache("wikidata", cache_dir) if use_cache else None
+        # One keep-alive session: repeat queries skip the TCP/TLS handshake.
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'FacilitiesGeocodingBot/1.0'
+        self.session.mount('https://', HTTPAdapter(
+            max_retries=Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=1,
+                status_forcelist=(429, 503),
+                raise_on_status=False
+            )
+        ))
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
 
-    def _rate_limit_wait(self):
-        """Wait to respect rate limits."""
-        global LAST_REQUEST_TIME
-        elapsed = time.time() - LAST_REQUEST_TIME
-        if elapsed < self.rate_limit:
-            time.sleep(self.rate_limit - elapsed)
-        LAST_REQUEST_TIME = time.time()
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _rate_limit_wait(self, endpoint: Optional[str] = None):
+        """Wait to respect rate limits for an endpoint (default: self.endpoint)."""
+        lock, last = _RATE_LIMIT_BUCKETS.setdefault(
+            endpoint or self.endpoint, (threading.Lock(), [float('-inf')])
+        )
+        with lock:
+            elapsed = time.monotonic() - last[0]
+            if elapsed < self.rate_limit:
+                time.sleep(self.rate_limit - elapsed)
+            last[0] = time.monotonic()
 
     def _build_mine_query(
         self,
@@ -217,25 +273,32 @@ class WikidataClient:
         Returns:
             List of result bindings
         """
+        if self.cache:
+            results = self.cache.get(self.endpoint, sparql)
+            if results is not None:
+                logger.debug("Wikidata query served from cache")
+                return results
+
         self._rate_limit_wait()
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 self.endpoint,
                 params={
                     'query': sparql,
                     'format': 'json'
                 },
-                headers={
-                    'User-Agent': 'FacilitiesGeocodingBot/1.0'
-                },
                 timeout=self.timeout
             )
             response.raise_for_status()
 
-            data = response.json()
+            data = orjson.loads(response.content) if orjson else response.json()
             results = data.get('results', {}).get('bindings', [])
 
+            # Empty results are not cached
+            if self.cache and results:
+                self.cache.set(self.endpoint, sparql, results)
+
             return results
 
         except requests.exceptions.Timeout:
@@ -259,19 +322,20 @@ class WikidataClient:
             List of WikidataItem objects
         """
         # Group results by QID (multiple rows for aliases)
-        items_by_qid = {}
+        items_by_qid: Dict[str, WikidataItem] = {}
+        # Aliases/commodities already recorded per QID. Rows are the cross
+        # product of the OPTIONAL clauses, so values repeat many times and
+        # list membership tests would be quadratic for alias-heavy items.
+        seen: Dict[str, Tuple[set, set]] = {}
 
         for binding in results:
             # Extract QID
             item_uri = binding.get('item', {}).get('value', '')
-            qid = item_uri.split('/')[-1] if item_uri else None
+            qid = item_uri.rsplit('/', 1)[-1] if item_uri else None
 
             if not qid or not qid.startswith('Q'):
                 continue
 
-            # Get label
-            label = binding.get('itemLabel', {}).get('value', qid)
-
             # Parse coordinates (format: "Point(lon lat)")
             coord_str = binding.get('coord', {}).get('value', '')
             lat, lon = self._parse_coordinate(coord_str)
@@ -279,47 +343,34 @@ class WikidataClient:
             if lat is None or lon is None:
                 continue
 
-            # Get alias
-            alias = binding.get('alias', {}).get('value')
-
-            # Get commodity
-            commodity = binding.get('commodityLabel', {}).get('value')
-
-            # Add or update item
-            if qid not in items_by_qid:
-                items_by_qid[qid] = {
-                    'qid': qid,
-                    'label': label,
-                    'lat': lat,
-                    'lon': lon,
-                    'aliases': [],
-                    'commodities': []
-                }
+            # First row for a QID creates the item; later rows add aliases
+            item = items_by_qid.get(qid)
+            if item is None:
+                seen[qid] = (set(), set())
+                item = items_by_qid[qid] = WikidataItem(
+                    qid=qid,
+                    label=binding.get('itemLabel', {}).get('value', qid),
+                    lat=lat,
+                    lon=lon,
+                    aliases=[],
+                    properties={'commodities': []}
+                )
+
+            seen_aliases, seen_commodities = seen[qid]
 
             # Add alias if present
-            if alias and alias not in items_by_qid[qid]['aliases']:
-                items_by_qid[qid]['aliases'].append(alias)
+            alias = binding.get('alias', {}).get('value')
+            if alias and alias not in seen_aliases:
+                seen_aliases.add(alias)
+                item.aliases.append(alias)
 
             # Add commodity if present
-            if commodity and commodity not in items_by_qid[qid]['commodities']:
-                items_by_qid[qid]['commodities'].append(commodity)
-
-        # Convert to WikidataItem objects
-        items = []
-        for qid, data in items_by_qid.items():
-            item = WikidataItem(
-                qid=data['qid'],
-                label=data['label'],
-                lat=data['lat'],
-                lon=data['lon'],
-                aliases=data['aliases'],
-                properties={
-                    'commodities': data['commodities']
-                }
-            )
-            items.append(item)
+            commodity = binding.get('commodityLabel', {}).get('value')
+            if commodity and commodity not in seen_commodities:
+                seen_commodities.add(commodity)
+                item.properties['commodities'].append(commodity)
 
-        return items
+        return list(items_by_qid.values())
 
     def _parse_coordinate(self, coord_str: str) -> tuple:
         """
@@ -338,8 +389,7 @@ class WikidataClient:
 
         try:
             # Extract coordinates from "Point(lon lat)"
-            import re
-            match = re.search(r'Point\(([+-]?\d+\.?\d*)\s+([+-]?\d+\.?\d*)\)', coord_str)
+            match = _WKT_POINT_RE.search(coord_str)
             if match:
                 lon = float(match.group(1))
                 lat = float(match.group(2))
@@ -1,5 +1,7 @@
 """Facility type normalization and mapping."""
 
+import re
+from functools import lru_cache
 from typing import Tuple
 
 # Type mapping table: messy strings → validated enum values
@@ -56,10 +58,28 @@ VALID_TYPES = {
 }
 
 
+# One pass over the input for the partial-match stage. The lookahead reports
+# the highest-priority key starting at every position; ranking those hits by
+# MAPPING order reproduces the "first key in MAPPING that occurs in r" rule.
+_PARTIAL_RE = re.compile("(?=(" + "|".join(map(re.escape, MAPPING)) + "))")
+_MAPPING_RANK = {k: i for i, k in enumerate(MAPPING)}
+
+# Containment check against VALID_TYPES as one scan. Longest alternative
+# first, so "processing_plant" wins over "plant" at the same position.
+_VALID_TYPE_RE = re.compile(
+    "|".join(map(re.escape, sorted(VALID_TYPES, key=lambda t: (-len(t), t))))
+)
+
+
+@lru_cache(maxsize=4096)
 def normalize_type(raw: str) -> Tuple[str, float]:
     """
     Normalize facility type string to validated enum value.
 
+    Memoized: raw type strings repeat heavily across facilities. Call
+    normalize_type.cache_clear() after mutating MAPPING or VALID_TYPES
+    (the precompiled patterns above must be rebuilt as well).
+
     Args:
         raw: Raw type string
 
@@ -86,22 +106,18 @@ def normalize_type(raw: str) -> Tuple[str, float]:
         return (MAPPING[r_norm], 0.9)
 
     # Partial match in mapping keys
-    for key, value in MAPPING.items():
-        if key in r:
-            return (value, 0.85)
+    hits = _PARTIAL_RE.findall(r)
+    if hits:
+        return (MAPPING[min(hits, key=_MAPPING_RANK.__getitem__)], 0.85)
 
     # Direct match with valid enum
     if r in VALID_TYPES:
         return (r, 0.8)
 
     # Check if contains valid type
-    for valid_type in VALID_TYPES:
-        if valid_type in r:
-            return (valid_type, 0.7)
-
-    # Special case: if contains "facility" but nothing else
-    if "facility" in r and not any(t in r for t in VALID_TYPES):
-        return ("facility", 0.3)
+    m = _VALID_TYPE_RE.search(r)
+    if m:
+        return (m.group(), 0.7)
 
-    # Default fallback
+    # Default fallback (also covers a bare "facility")
     return ("facility", 0.3)
\ No newline at end of file
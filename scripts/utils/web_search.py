@@ -10,18 +10,46 @@ Usage:
 
     client = WebSearchClient()
     results = client.search("Karee Mine South Africa coordinates")
+
+    # Several queries at once (input order preserved)
+    per_query = client.search_many(["Karee Mine coordinates", "Inkai Mine coordinates"])
 """
 
 import os
+import random
+import threading
 import time
 import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
 from typing import Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError, Timeout, RequestException
 
+from .sources.query_cache import QueryCache
+
 logger = logging.getLogger(__name__)
 
+# Concurrent searches in search_many (kept low for provider rate limits)
+MAX_CONCURRENCY = 5
+
+# Distinct queries remembered in memory per client (oldest evicted first)
+MEMO_SIZE = 4096
+
+
+def _new_session() -> requests.Session:
+    """Keep-alive session pooling connections to the search APIs."""
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    return session
+
+
+# Shared by the standalone tavily_search/brave_search helpers, so repeated
+# calls reuse connections instead of paying a TLS handshake each time
+_DEFAULT_SESSION = _new_session()
+
 
 def _should_retry(status_code: Optional[int]) -> bool:
     """Return True if status indicates a transient/rate-limit issue."""
@@ -30,6 +58,24 @@ def _should_retry(status_code: Optional[int]) -> bool:
     return status_code in {408, 420, 429, 430, 431, 432, 499, 500, 502, 503, 504}
 
 
+def _retry_wait(attempt: int, response: Optional[requests.Response] = None) -> float:
+    """
+    Seconds to wait before retry number `attempt` (1-based).
+
+    Exponential backoff (1, 2, 4, ... capped at 60s) plus up to 1s of jitter,
+    so concurrent workers that were throttled together do not retry in
+    lockstep. A server-supplied Retry-After (in seconds) takes precedence
+    when it asks for longer.
+    """
+    wait = min(60, 2 ** (attempt - 1)) + random.random()
+    if response is not None:
+        try:
+            wait = max(wait, float(response.headers.get('Retry-After', 0)))
+        except (TypeError, ValueError):
+            pass  # HTTP-date form: fall back to the backoff
+    return wait
+
+
 class WebSearchClient:
     """
     Unified web search client supporting Tavily and Brave APIs.
@@ -39,6 +85,12 @@ class WebSearchClient:
         brave_key: Brave API key (from BRAVE_API_KEY env var)
         preferred_provider: Which API to try first ('tavily' or 'brave')
         fallback: Whether to try the other provider if first fails
+        hedged: With fallback and both keys, query both providers at once
+            and take the first non-empty result (costs quota on both)
+        session: HTTP session reused across searches (keep-alive)
+        cache: On-disk cache of results per (provider, query, max_results),
+            or None when disabled
+        api_calls: Provider searches sent so far (cache/memo hits excluded)
     """
 
     def __init__(
@@ -46,12 +98,25 @@ class WebSearchClient:
         tavily_key: Optional[str] = None,
         brave_key: Optional[str] = None,
         preferred_provider: str = 'tavily',
-        fallback: bool = True
+        fallback: bool = True,
+        hedged: bool = False,
+        session: Optional[requests.Session] = None,
+        use_cache: bool = True,
+        cache_dir: Optional[Path] = None
     ):
         self.tavily_key = tavily_key or os.getenv('TAVILY_API_KEY')
         self.brave_key = brave_key or os.getenv('BRAVE_API_KEY')
         self.preferred_provider = preferred_provider
         self.fallback = fallback
+        self.hedged = hedged
+        self.session = session or _new_session()
+        # Repeat scans skip both the API latency and the quota cost
+        self.cache = QueryCache("web_search", cache_dir) if use_cache else None
+        # (query, max_results) -> results for this client's lifetime
+        self._memo: Dict[tuple, List[Dict]] = {}
+        self._memo_lock = threading.Lock()
+        self.api_calls = 0
+        self._calls_lock = threading.Lock()
 
         # Validate at least one provider is available
         if not self.tavily_key and not self.brave_key:
@@ -66,6 +131,9 @@ class WebSearchClient:
         """
         Search using configured provider(s).
 
+        Identical queries within a run are answered from memory (before the
+        on-disk cache); callers get their own copies of the result dicts.
+
         Args:
             query: Search query string
             max_results: Maximum number of results to return
@@ -74,6 +142,22 @@ class WebSearchClient:
         Returns:
             List of search results with 'title', 'url', 'content' keys
         """
+        key = (query, max_results)
+        with self._memo_lock:
+            results = self._memo.get(key)
+
+        if results is None:
+            results = self._search(query, max_results, retries)
+            if results:
+                with self._memo_lock:
+                    if len(self._memo) >= MEMO_SIZE:
+                        self._memo.pop(next(iter(self._memo)))
+                    self._memo[key] = results
+
+        return [dict(r) for r in results]
+
+    def _search(self, query: str, max_results: int, retries: int) -> List[Dict]:
+        """Run a search through the disk cache and the providers."""
         providers = []
 
         if self.preferred_provider == 'tavily' and self.tavily_key:
@@ -99,17 +183,120 @@ class WebSearchClient:
             logger.error("No search API keys available")
             return []
 
+        # Result count is part of the key: the same query asked with a
+        # larger max_results must not be served a shorter cached list
+        cache_query = f"{max_results}\n{query}"
+
+        if self.hedged and len(providers) > 1:
+            if self.cache:
+                for provider, _ in providers:
+                    results = self.cache.get(provider, cache_query)
+                    if results:
+                        logger.debug(f"{provider} search served from cache: {query}")
+                        return results
+
+            provider, results = self._race_providers(providers, query, max_results, retries)
+            if results and self.cache:
+                self.cache.set(provider, cache_query, results)
+            return results
+
         for provider, api_key in providers:
-            if provider == 'tavily':
-                results = self._tavily_search(query, api_key, max_results, retries)
-            else:
-                results = self._brave_search(query, api_key, max_results, retries)
+            if self.cache:
+                results = self.cache.get(provider, cache_query)
+                if results:
+                    logger.debug(f"{provider} search served from cache: {query}")
+                    return results
+
+            results = self._search_provider(provider, api_key, query, max_results, retries)
 
             if results:
+                # Only successful searches are cached; failures are retried
+                if self.cache:
+                    self.cache.set(provider, cache_query, results)
                 return results
 
         return []
 
+    def _search_provider(
+        self,
+        provider: str,
+        api_key: str,
+        query: str,
+        max_results: int,
+        retries: int
+    ) -> List[Dict]:
+        """Search a single provider ('tavily' or 'brave')."""
+        with self._calls_lock:
+            self.api_calls += 1
+        if provider == 'tavily':
+            return self._tavily_search(query, api_key, max_results, retries)
+        return self._brave_search(query, api_key, max_results, retries)
+
+    def _race_providers(
+        self,
+        providers: List[tuple],
+        query: str,
+        max_results: int,
+        retries: int
+    ) -> tuple:
+        """
+        Query all providers at once; return the first non-empty result.
+
+        Latency becomes that of the fastest successful provider rather than
+        the preferred provider's full retry sequence plus the fallback. The
+        slower request is not waited for (a running request cannot be
+        cancelled, so it finishes in the background and is discarded).
+
+        Returns:
+            (provider, results), or (None, []) if every provider failed
+        """
+        pool = ThreadPoolExecutor(max_workers=len(providers))
+        try:
+            pending = {
+                pool.submit(self._search_provider, provider, api_key, query, max_results, retries): provider
+                for provider, api_key in providers
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    provider = pending.pop(future)
+                    results = future.result()
+                    if results:
+                        return provider, results
+            return None, []
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def search_many(
+        self,
+        queries: List[str],
+        max_results: int = 10,
+        retries: int = 3,
+        max_workers: int = MAX_CONCURRENCY
+    ) -> List[List[Dict]]:
+        """
+        Run several searches concurrently over the shared session.
+
+        Each query goes through search() (provider order, fallback and
+        retries unchanged); only the network waits overlap.
+
+        Args:
+            queries: Search query strings
+            max_results: Maximum number of results per query
+            retries: Number of retry attempts per provider
+            max_workers: Maximum concurrent searches
+
+        Returns:
+            One result list per query, in input order
+        """
+        def run(query: str) -> List[Dict]:
+            return self.search(query, max_results=max_results, retries=retries)
+
+        if max_workers <= 1 or len(queries) <= 1:
+            return [run(q) for q in queries]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(run, queries))
+
     def _tavily_search(
         self,
         query: str,
@@ -130,22 +317,23 @@ class WebSearchClient:
 
         for attempt in range(1, retries + 1):
             try:
-                response = requests.post(url, json=payload, timeout=30)
+                response = self.session.post(url, json=payload, timeout=30)
                 response.raise_for_status()
                 data = response.json()
                 return data.get("results", [])
             except HTTPError as e:
-                status = e.response.status_code if e.response else None
+                # Error responses are falsy, so compare against None
+                status = e.response.status_code if e.response is not None else None
                 if _should_retry(status):
-                    wait = min(60, attempt * 5)
-                    logger.info(f"Tavily rate limit ({status}). Retrying in {wait}s...")
+                    wait = _retry_wait(attempt, e.response)
+                    logger.info(f"Tavily rate limit ({status}). Retrying in {wait:.1f}s...")
                     time.sleep(wait)
                     continue
                 logger.warning(f"Tavily search error ({status}): {e}")
                 break
             except (Timeout, RequestException) as e:
-                wait = min(60, attempt * 5)
-                logger.info(f"Tavily network issue: {e}. Retrying in {wait}s...")
+                wait = _retry_wait(attempt)
+                logger.info(f"Tavily network issue: {e}. Retrying in {wait:.1f}s...")
                 time.sleep(wait)
             except Exception as e:
                 logger.warning(f"Tavily search error: {e}")
@@ -172,7 +360,7 @@ class WebSearchClient:
 
         for attempt in range(1, retries + 1):
             try:
-                response = requests.get(url, headers=headers, params=params, timeout=30)
+                response = self.session.get(url, headers=headers, params=params, timeout=30)
                 response.raise_for_status()
                 data = response.json()
 
@@ -186,17 +374,18 @@ class WebSearchClient:
                     })
                 return results
             except HTTPError as e:
-                status = e.response.status_code if e.response else None
+                # Error responses are falsy, so compare against None
+                status = e.response.status_code if e.response is not None else None
                 if _should_retry(status):
-                    wait = min(60, attempt * 5)
-                    logger.info(f"Brave rate limit ({status}). Retrying in {wait}s...")
+                    wait = _retry_wait(attempt, e.response)
+                    logger.info(f"Brave rate limit ({status}). Retrying in {wait:.1f}s...")
                     time.sleep(wait)
                     continue
                 logger.warning(f"Brave search error ({status}): {e}")
                 break
             except (Timeout, RequestException) as e:
-                wait = min(60, attempt * 5)
-                logger.info(f"Brave network issue: {e}. Retrying in {wait}s...")
+                wait = _retry_wait(attempt)
+                logger.info(f"Brave network issue: {e}. Retrying in {wait:.1f}s...")
                 time.sleep(wait)
             except Exception as e:
                 logger.warning(f"Brave search error: {e}")
@@ -207,11 +396,11 @@ class WebSearchClient:
 # Convenience functions for backward compatibility
 def tavily_search(query: str, api_key: str, retries: int = 3) -> List[Dict]:
     """Standalone Tavily search (for backward compatibility)."""
-    client = WebSearchClient(tavily_key=api_key, fallback=False)
+    client = WebSearchClient(tavily_key=api_key, fallback=False, session=_DEFAULT_SESSION, use_cache=False)
     return client._tavily_search(query, api_key, max_results=10, retries=retries)
 
 
 def brave_search(query: str, api_key: str, retries: int = 3) -> List[Dict]:
     """Standalone Brave search (for backward compatibility)."""
-    client = WebSearchClient(brave_key=api_key, fallback=False)
+    client = WebSearchClient(brave_key=api_key, fallback=False, session=_DEFAULT_SESSION, use_cache=False)
     return client._brave_search(query, api_key, max_results=10, retries=retries)